@@ -1,11 +1,14 @@
 import os
-from typing import Optional, List, Dict
+import asyncio
+from typing import Optional, List, Dict, Tuple
 import logging
 from crewai import Crew, Process, Agent, Task
 from llm import create_llm
 from processgpt_agent_utils.utils.crew_event_logger import CrewConfigManager
 from processgpt_agent_utils.tools.safe_tool_loader import SafeToolLoader
 from prompt_generator import DynamicPromptGenerator
+from tool_loader import TaggedSafeToolLoader
+from utils import BoundedLRU
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -31,24 +34,6 @@ DEFAULT_TOOL_PRIORITY_WITH_SKILLS = ["claude-skills", "computer-use", "dmn_rule"
 DEFAULT_TOOL_PRIORITY_NO_SKILLS = ["dmn_rule", "mem0", "*"]
 
 
-class TaggedSafeToolLoader(SafeToolLoader):
-    """MCP 서버 출처를 Tool 객체에 태깅하는 SafeToolLoader 래퍼.
-
-    crewai_tools.MCPServerAdapter가 반환하는 Tool 객체는 기본적으로 '어느 MCP 서버에서 왔는지' 정보가 없어서
-    우선순위 정렬을 위해 서버 키를 attribute로 주입합니다.
-    """
-
-    def _load_mcp_tool(self, tool_name: str) -> List:
-        tools = super()._load_mcp_tool(tool_name)
-        for t in tools or []:
-            try:
-                setattr(t, "_processgpt_mcp_server", tool_name)
-            except Exception:
-                # 일부 Tool 구현은 setattr이 막혀 있을 수 있어 무시합니다.
-                pass
-        return tools
-
-
 def _get_tool_name(tool) -> str:
     name = getattr(tool, "name", None)
     if isinstance(name, str) and name.strip():
@@ -197,16 +182,41 @@ class AgentWithProfile(Agent):
 # 에이전트 생성
 # - 입력 정보와 로드된 도구로 동적 에이전트를 생성합니다.
 # =============================
+LLM_CLIENT_CACHE_SIZE = 32
+_llm_clients = BoundedLRU(LLM_CLIENT_CACHE_SIZE)
+
+
+def _get_llm(model_name: Optional[str], temperature: float):
+    """(모델, temperature)별 LLM 클라이언트를 재사용 (작업마다 HTTP 커넥션 풀을 새로 만들지 않음).
+
+    정상 생성된 클라이언트만 캐시한다. 생성 실패(예외/None)는 캐시하지 않으므로
+    env/설정을 고치면 서버 재시작 없이 다음 작업부터 다시 생성을 시도한다.
+    """
+    return _llm_clients.get_or_create(
+        (model_name, temperature),
+        lambda: create_llm(model=model_name, temperature=temperature),
+    )
+
+
+def _get_agent_llm(agent_info: Dict):
+    """에이전트 정보의 model(없으면 LLM_MODEL)에 해당하는 공유 LLM 클라이언트"""
+    model_str = agent_info.get("model") or os.getenv("LLM_MODEL") or ""
+    model_name = model_str.split("/", 1)[1] if "/" in model_str else (model_str or None)
+    return _get_llm(model_name, 0.1)
+
+
+def _get_prompt_llm(agent_info: Dict):
+    """Task 프롬프트 생성용 LLM: PROMPT_GENERATOR_MODEL 지정 시 해당(보통 더 가볍고 빠른) 모델, 없으면 매니저 에이전트 모델"""
+    model_str = os.getenv("PROMPT_GENERATOR_MODEL", "").strip()
+    if not model_str:
+        return _get_agent_llm(agent_info)
+    return _get_agent_llm({"model": model_str})
+
+
 def create_dynamic_agent(agent_info: Dict, tools: List) -> AgentWithProfile:
     """에이전트 정보를 바탕으로 동적으로 Agent 객체 생성"""
     try:
-        model_str = agent_info.get("model") or os.getenv("LLM_MODEL") or ""
-        model_name = model_str.split("/", 1)[1] if "/" in model_str else (model_str or None)
-
-        llm_instance = create_llm(
-            model=model_name,
-            temperature=0.1
-        )
+        llm_instance = _get_agent_llm(agent_info)
 
         agent = AgentWithProfile(
             role=agent_info.get("role", "범용 AI 어시스턴트"),
@@ -226,6 +236,33 @@ def create_dynamic_agent(agent_info: Dict, tools: List) -> AgentWithProfile:
         logger.error(f"❌ 에이전트 생성 실패: {e}", exc_info=True)
         raise
 
+async def _generate_task_prompts(
+    llm,
+    task_instructions: str,
+    form_types: Dict | None,
+    form_html: str,
+    current_activity_name: str,
+    feedback_summary: str,
+    agent_info: List[Dict] | None,
+    user_info: List[Dict] | None,
+    sources: List[Dict] | None,
+    tool_priority_order: Optional[List[str]],
+) -> Tuple[str, str]:
+    """동적 프롬프트(description, expected_output) 생성"""
+    logger.info("\n\n📝 동적 프롬프트 생성 시작...")
+    prompt_generator = DynamicPromptGenerator(llm=llm)
+    return await prompt_generator.generate_task_prompt(
+        task_instructions=task_instructions,
+        agent_info=agent_info or [],  # 원본 agent_info를 그대로 사용 (id만 필요)
+        form_types=form_types,
+        form_html=form_html,
+        feedback_summary=feedback_summary,
+        current_activity_name=current_activity_name,
+        user_info=user_info or [],
+        sources=sources or [],
+        tool_priority_order=tool_priority_order,
+    )
+
 # =============================
 # 태스크 생성
 # - 사용자 요청을 바탕으로 프롬프트를 만들고 플래닝 태스크를 생성합니다.
@@ -241,29 +278,26 @@ async def create_user_task(
     user_info: List[Dict] | None = None,
     sources: List[Dict] | None = None,
     tool_priority_order: Optional[List[str]] = None,
+    prompts: Optional[Tuple[str, str]] = None,
 ) -> Task:
-    """사용자 요청을 바탕으로 동적 프롬프트 생성하여 단일 Task 생성"""
+    """사용자 요청을 바탕으로 동적 프롬프트 생성하여 단일 Task 생성
+    prompts(description, expected_output)가 주어지면 프롬프트 생성을 건너뛴다.
+    """
     try:
-        logger.info("\n\n📝 동적 프롬프트 생성 시작...")
-        
-        # 동적 프롬프트 생성기 초기화 (에이전트의 LLM 사용)
-        prompt_generator = DynamicPromptGenerator(llm=agent._llm_raw)
-        
-        # 원본 agent_info를 그대로 사용 (id만 필요)
-        agent_dict_list = agent_info if agent_info else []
-        
-        # 동적 프롬프트 생성
-        description, expected_output = await prompt_generator.generate_task_prompt(
-            task_instructions=task_instructions,
-            agent_info=agent_dict_list,
-            form_types=form_types,
-            form_html=form_html,
-            feedback_summary=feedback_summary,
-            current_activity_name=current_activity_name,
-            user_info=user_info or [],
-            sources=sources or [],
-            tool_priority_order=tool_priority_order,
-        )
+        if prompts is None:
+            prompts = await _generate_task_prompts(
+                llm=agent._llm_raw,
+                task_instructions=task_instructions,
+                form_types=form_types,
+                form_html=form_html,
+                current_activity_name=current_activity_name,
+                feedback_summary=feedback_summary,
+                agent_info=agent_info,
+                user_info=user_info,
+                sources=sources,
+                tool_priority_order=tool_priority_order,
+            )
+        description, expected_output = prompts
         
         # 플래닝에서 필요한 InputData 원본만 description 뒤에 덧붙인다 (Description/Instruction은 제외)
         input_section = ""
@@ -305,6 +339,7 @@ async def create_crew(
     tool_priority_order: Optional[List[str]] = None,
 ):
     """에이전트/태스크를 구성해 크루를 생성합니다."""
+    prompt_task = None
     try:
         global _event_manager
         logger.info(f"🚀 동적 크루 생성 시작 - 에이전트: {len(agent_info) if agent_info else 0}개")
@@ -325,8 +360,39 @@ async def create_crew(
                 "tools": ""  # 기본값으로 빈 문자열 설정
             }]
         
+        # 매니저(첫 에이전트) 기준 도구 우선순위: 인자로 넘어온 값 > 첫 에이전트 설정 > 기본
+        first_info = agent_info[0] if agent_info else {}
+        has_skills_0 = bool(first_info.get("skills"))
+        first_agent_skills = _get_agent_skill_names(first_info.get("skills"))
+        effective_priority_order = tool_priority_order
+        if not (isinstance(effective_priority_order, list) and len(effective_priority_order) > 0):
+            effective_priority_order = first_info.get("tool_priority_order") or first_info.get("tool_priority")
+        if not (isinstance(effective_priority_order, list) and len(effective_priority_order) > 0):
+            if has_skills_0 and first_agent_skills:
+                # 스킬이 있으면 첫 스킬명을 사용해 기본 순서 구성(프롬프트 표시용)
+                effective_priority_order = [first_agent_skills[0], "dmn_rule", "mem0", "*"]
+            else:
+                effective_priority_order = (
+                    DEFAULT_TOOL_PRIORITY_WITH_SKILLS if has_skills_0 else DEFAULT_TOOL_PRIORITY_NO_SKILLS
+                )
+
+        # 프롬프트 생성(LLM 호출)은 에이전트 정보만 있으면 되므로 MCP 도구 로딩과 겹쳐서 실행
+        prompt_task = asyncio.create_task(_generate_task_prompts(
+            llm=_get_prompt_llm(first_info),
+            task_instructions=task_instructions,
+            form_types=form_types,
+            form_html=form_html,
+            current_activity_name=current_activity_name,
+            feedback_summary=feedback_summary,
+            agent_info=agent_info,  # 원본 딕셔너리 리스트 전달
+            user_info=user_info,
+            sources=sources,
+            tool_priority_order=effective_priority_order,
+        ))
+
         agents = []
-        logger.info(f"\n\n🔧 에이전트 생성 시작 : {agent_info}")
+        # agent_info 전체(backstory 등)는 크므로 이름만 기록
+        logger.info("\n\n🔧 에이전트 생성 시작 : %s", [info.get("username") or info.get("role") for info in agent_info])
         for info in agent_info:
             try:
                 user_id = info.get('id') or info.get('user_id')
@@ -346,7 +412,7 @@ async def create_crew(
                 loader = None
                 try:
                     loader = TaggedSafeToolLoader(tenant_id=tenant_id, user_id=user_id, agent_name=agent_name, mcp_config=tenant_mcp)
-                    tools = loader.create_tools_from_names(tool_names)
+                    tools = await loader.acreate_tools_from_names(tool_names)
                     tools = prioritize_tools(tools, has_skills=has_skills, custom_order=custom_order, agent_skills=agent_skills)
                     logger.info(f"✅ 에이전트 '{agent_name}') 툴 로딩 성공: {len(tools)}개")
                 except HTTP_CONNECTION_ERRORS as e:
@@ -389,22 +455,6 @@ async def create_crew(
         
         manager = agents[0]
 
-        # 매니저(첫 에이전트) 기준 도구 우선순위: 인자로 넘어온 값 > 첫 에이전트 설정 > 기본
-        first_info = agent_info[0] if agent_info else {}
-        has_skills_0 = bool(first_info.get("skills"))
-        first_agent_skills = _get_agent_skill_names(first_info.get("skills"))
-        effective_priority_order = tool_priority_order
-        if not (isinstance(effective_priority_order, list) and len(effective_priority_order) > 0):
-            effective_priority_order = first_info.get("tool_priority_order") or first_info.get("tool_priority")
-        if not (isinstance(effective_priority_order, list) and len(effective_priority_order) > 0):
-            if has_skills_0 and first_agent_skills:
-                # 스킬이 있으면 첫 스킬명을 사용해 기본 순서 구성(프롬프트 표시용)
-                effective_priority_order = [first_agent_skills[0], "dmn_rule", "mem0", "*"]
-            else:
-                effective_priority_order = (
-                    DEFAULT_TOOL_PRIORITY_WITH_SKILLS if has_skills_0 else DEFAULT_TOOL_PRIORITY_NO_SKILLS
-                )
-
         # 사용자 요청 기반 태스크 생성 (매니저 에이전트에 할당)
         task = await create_user_task(
             task_instructions=task_instructions,
@@ -417,6 +467,7 @@ async def create_crew(
             user_info=user_info,
             sources=sources,
             tool_priority_order=effective_priority_order,
+            prompts=await prompt_task,
         )
         logger.info("\n\n✅ 사용자 태스크 생성 완료")
         
@@ -435,4 +486,8 @@ async def create_crew(
         
     except Exception as e:
         logger.error(f"❌ 크루 생성 실패: {e}", exc_info=True)
-        raise 
\ No newline at end of file
+        raise
+    finally:
+        # 에이전트 생성 실패 등으로 중단되면 진행 중인 프롬프트 생성도 취소
+        if prompt_task is not None and not prompt_task.done():
+            prompt_task.cancel()
@@ -7,7 +7,7 @@ from a2a.server.events import EventQueue
 from a2a.types import TaskStatusUpdateEvent, TaskState, TaskArtifactUpdateEvent
 from a2a.utils import new_agent_text_message, new_text_artifact
 from crew_factory import create_crew
-from utils import convert_crew_output
+from utils import convert_crew_output, dumps_json, log_preview
 from processgpt_agent_utils.utils.context_manager import set_context
 from processgpt_agent_utils.tools.safe_tool_loader import SafeToolLoader
 from processgpt_agent_utils.tools.deterministic_code_tool import DeterministicCodeTool
@@ -15,6 +15,23 @@ from processgpt_agent_utils.tools.deterministic_code_tool import DeterministicCo
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+
+def _agent_header(role: str, goal: str) -> str:
+    """task_started 이벤트 메시지로 쓰는 가상 에이전트 헤더 JSON"""
+    return dumps_json(
+        {
+            "role": role,
+            "name": role,
+            "goal": goal,
+            "agent_profile": "/images/chat-icon.png",
+        }
+    )
+
+
+# 내용이 고정된 헤더는 작업마다 다시 직렬화하지 않도록 모듈 로드 시 한 번만 만든다
+_FINAL_RESULT_HEADER = _agent_header("최종 결과 반환", "요청된 폼 형식에 맞는 최종 결과를 반환합니다.")
+_DETERMINISTIC_RESULT_HEADER = _agent_header("결정론적 코드 실행 결과", "결정론적 코드 실행의 결과를 보고합니다.")
+
 class CrewAIActionExecutor(AgentExecutor):
     """CrewAI 실행기 - context에서 데이터 추출 후 CrewAI 실행"""
 
@@ -78,15 +95,7 @@ class CrewAIActionExecutor(AgentExecutor):
             event_queue=event_queue,
             state=TaskState.working,
             message=new_agent_text_message(
-                json.dumps(
-                    {
-                        "role": "최종 결과 반환",
-                        "name": "최종 결과 반환",
-                        "goal": "요청된 폼 형식에 맞는 최종 결과를 반환합니다.",
-                        "agent_profile": "/images/chat-icon.png",
-                    },
-                    ensure_ascii=False,
-                ),
+                _FINAL_RESULT_HEADER,
                 proc_inst_id,
                 task_id,
             ),
@@ -104,7 +113,7 @@ class CrewAIActionExecutor(AgentExecutor):
             event_queue=event_queue,
             state=TaskState.completed,
             message=new_agent_text_message(
-                json.dumps(form_data, ensure_ascii=False),
+                dumps_json(form_data),
                 proc_inst_id,
                 task_id,
             ),
@@ -118,6 +127,54 @@ class CrewAIActionExecutor(AgentExecutor):
         )
 
 
+    def _publish_field_events(
+        self,
+        event_queue: EventQueue,
+        crew_type: str,
+        label: str,
+        field_key: str,
+        field_value: str,
+        job_id: str,
+        proc_inst_id: str,
+        task_id: str,
+    ) -> None:
+        """리포트/슬라이드 필드 하나에 대한 이벤트 쌍 발행 (working + completed)"""
+        self._publish_task_status_event(
+            event_queue=event_queue,
+            state=TaskState.working,
+            message=new_agent_text_message(
+                _agent_header(f"{label} 생성", f"{label} 필드 '{field_key}'를 생성합니다."),
+                proc_inst_id,
+                task_id,
+            ),
+            proc_inst_id=proc_inst_id,
+            task_id=task_id,
+            metadata={
+                "crew_type": crew_type,
+                "event_type": "task_started",
+                "job_id": job_id,
+            },
+        )
+
+        # completed 상태 이벤트 (필드 데이터 포함)
+        self._publish_task_status_event(
+            event_queue=event_queue,
+            state=TaskState.completed,
+            message=new_agent_text_message(
+                dumps_json({field_key: field_value}),
+                proc_inst_id,
+                task_id,
+            ),
+            proc_inst_id=proc_inst_id,
+            task_id=task_id,
+            metadata={
+                "crew_type": crew_type,
+                "event_type": "task_completed",
+                "job_id": job_id,
+            },
+        )
+
+
     def _generate_deterministic(self, tenant_id: str, task_id: str) -> bool:
         """Deterministic 코드 생성만 수행. 실패해도 예외를 전파하지 않는다.
         Returns True on success, False on failure.
@@ -141,7 +198,7 @@ class CrewAIActionExecutor(AgentExecutor):
             job_uuid = str(uuid.uuid4())
     
             det_result = det_tool._run(tenant_id=tenant_id, todo_id=task_id)
-            logger.info(f"🔍 Deterministic Code Tool 실행 결과: {det_result}")
+            logger.info("🔍 Deterministic Code Tool 실행 결과 (처음 200자): %s", log_preview(det_result))
             det_result_json = json.loads(det_result)
             
             if det_result_json.get("ok"):
@@ -150,15 +207,7 @@ class CrewAIActionExecutor(AgentExecutor):
                     event_queue=event_queue,
                     state=TaskState.working,
                     message=new_agent_text_message(
-                        json.dumps(
-                            {
-                                "role": "결정론적 코드 실행 결과",
-                                "name": "결정론적 코드 실행 결과",
-                                "goal": "결정론적 코드 실행의 결과를 보고합니다.",
-                                "agent_profile": "/images/chat-icon.png",
-                            },
-                            ensure_ascii=False,
-                        ),
+                        _DETERMINISTIC_RESULT_HEADER,
                         proc_inst_id,
                         task_id,
                     ),
@@ -207,7 +256,7 @@ class CrewAIActionExecutor(AgentExecutor):
                     event_queue=event_queue,
                     artifact_name="deterministic_action_result",
                     artifact_description="Deterministic Action 실행 결과",
-                    artifact_text=json.dumps(det_result_json, ensure_ascii=False),
+                    artifact_text=det_result,  # 이미 JSON 문자열이므로 다시 직렬화하지 않음
                     proc_inst_id=proc_inst_id,
                     task_id=task_id,
                 )
@@ -229,7 +278,10 @@ class CrewAIActionExecutor(AgentExecutor):
             # Context에서 데이터 추출
             query = context.get_user_input()
             context_data = context.get_context_data()
-            logger.info(f"📝 Query: {query}\n\n" if query else "📝 Query: 없음")
+            if query:
+                logger.info("📝 Query (%d자): %s\n\n", len(query), log_preview(query, 500))
+            else:
+                logger.info("📝 Query: 없음")
             
             # SDK 컨텍스트 구조: {"row": self.row, "extras": self._extra_context}
             row = context_data.get("row", {})
@@ -296,106 +348,21 @@ class CrewAIActionExecutor(AgentExecutor):
             job_uuid = str(uuid.uuid4())
             logger.info("\n\n📤 최종 결과 이벤트 발송")
             
-            # 리포트 필드 이벤트 발행
+            # 리포트/슬라이드 필드 이벤트 발행 (리포트 job_id는 병합 키 고정, 슬라이드는 매번 새 UUID)
             for field_key, field_value in report_fields.items():
                 if field_value:  # 값이 있는 경우만 발행
-                    field_job_uuid = str(f"final_report_merge_{field_key}")
                     logger.info(f"📄 리포트 필드 이벤트 발행: {field_key}")
-                    
-                    # working 상태 이벤트
-                    self._publish_task_status_event(
-                        event_queue=event_queue,
-                        state=TaskState.working,
-                        message=new_agent_text_message(
-                            json.dumps(
-                                {
-                                    "role": "리포트 생성",
-                                    "name": "리포트 생성",
-                                    "goal": f"리포트 필드 '{field_key}'를 생성합니다.",
-                                    "agent_profile": "/images/chat-icon.png",
-                                },
-                                ensure_ascii=False,
-                            ),
-                            proc_inst_id,
-                            task_id,
-                        ),
-                        proc_inst_id=proc_inst_id,
-                        task_id=task_id,
-                        metadata={
-                            "crew_type": "report",
-                            "event_type": "task_started",
-                            "job_id": field_job_uuid,
-                        },
-                    )
-
-                    # completed 상태 이벤트 (리포트 데이터 포함)
-                    report_data = {field_key: field_value}
-                    self._publish_task_status_event(
-                        event_queue=event_queue,
-                        state=TaskState.completed,
-                        message=new_agent_text_message(
-                            json.dumps(report_data, ensure_ascii=False),
-                            proc_inst_id,
-                            task_id,
-                        ),
-                        proc_inst_id=proc_inst_id,
-                        task_id=task_id,
-                        metadata={
-                            "crew_type": "report",
-                            "event_type": "task_completed",
-                            "job_id": field_job_uuid,
-                        },
+                    self._publish_field_events(
+                        event_queue, "report", "리포트", field_key, field_value,
+                        f"final_report_merge_{field_key}", proc_inst_id, task_id,
                     )
 
-            # 슬라이드 필드 이벤트 발행
             for field_key, field_value in slide_fields.items():
                 if field_value:  # 값이 있는 경우만 발행
-                    field_job_uuid = str(uuid.uuid4())
                     logger.info(f"📊 슬라이드 필드 이벤트 발행: {field_key}")
-                    
-                    # working 상태 이벤트
-                    self._publish_task_status_event(
-                        event_queue=event_queue,
-                        state=TaskState.working,
-                        message=new_agent_text_message(
-                            json.dumps(
-                                {
-                                    "role": "슬라이드 생성",
-                                    "name": "슬라이드 생성",
-                                    "goal": f"슬라이드 필드 '{field_key}'를 생성합니다.",
-                                    "agent_profile": "/images/chat-icon.png",
-                                },
-                                ensure_ascii=False,
-                            ),
-                            proc_inst_id,
-                            task_id,
-                        ),
-                        proc_inst_id=proc_inst_id,
-                        task_id=task_id,
-                        metadata={
-                            "crew_type": "slide",
-                            "event_type": "task_started",
-                            "job_id": field_job_uuid,
-                        },
-                    )
-
-                    # completed 상태 이벤트 (슬라이드 데이터 포함)
-                    slide_data = {field_key: field_value}
-                    self._publish_task_status_event(
-                        event_queue=event_queue,
-                        state=TaskState.completed,
-                        message=new_agent_text_message(
-                            json.dumps(slide_data, ensure_ascii=False),
-                            proc_inst_id,
-                            task_id,
-                        ),
-                        proc_inst_id=proc_inst_id,
-                        task_id=task_id,
-                        metadata={
-                            "crew_type": "slide",
-                            "event_type": "task_completed",
-                            "job_id": field_job_uuid,
-                        },
+                    self._publish_field_events(
+                        event_queue, "slide", "슬라이드", field_key, field_value,
+                        str(uuid.uuid4()), proc_inst_id, task_id,
                     )
             
             # 일반 폼 데이터 이벤트 발행
@@ -412,7 +379,7 @@ class CrewAIActionExecutor(AgentExecutor):
                 event_queue=event_queue,
                 artifact_name="crewai_action_result",
                 artifact_description="CrewAI Action 실행 결과",
-                artifact_text=json.dumps(wrapped_result, ensure_ascii=False),
+                artifact_text=dumps_json(wrapped_result),
                 proc_inst_id=proc_inst_id,
                 task_id=task_id,
             )
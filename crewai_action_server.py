@@ -37,9 +37,21 @@ async def main():
         logger.error(f"❌ 서버 실행 중 오류 발생: {e}", exc_info=True)
         raise
 
-if __name__ == "__main__":
+def _run_server() -> None:
+    """uvloop이 있으면(Linux 의존성) uvloop 이벤트 루프로, 없으면 기본 asyncio 루프로 main 실행.
+    이벤트 루프 정책(deprecated)을 바꾸지 않으므로 MCP 어댑터 스레드의 루프는 기본 asyncio 그대로다.
+    """
     try:
+        import uvloop
+    except ImportError:
         asyncio.run(main())
+        return
+    logger.info("⚡ uvloop 이벤트 루프 사용")
+    uvloop.run(main())
+
+if __name__ == "__main__":
+    try:
+        _run_server()
     except KeyboardInterrupt:
         logger.info("🛑 서버 종료 요청됨")
     except Exception as e:
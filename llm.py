@@ -7,16 +7,39 @@ This also hardens against transient streaming/SSE transport errors like:
 
 Key point: LangChain agents may use `.astream()` internally even when `streaming=False`.
 Setting `disable_streaming=True` forces the underlying model to not use streaming transport.
+
+All ChatOpenAI instances share one pair of httpx clients, so keep-alive connections
+(and their TLS sessions) to the proxy are reused across agents and tasks.
 """
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional, Tuple, Union
 import os
 
 TimeoutType = Union[float, Tuple[float, float]]
 
 
+# Connection pool sizing for the shared clients (env-overridable).
+HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "50"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "30"))
+
+
+@lru_cache(maxsize=1)
+def _shared_http_clients():
+    """Process-wide (sync, async) httpx clients; per-request timeouts are still set by ChatOpenAI."""
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.Client(limits=limits), httpx.AsyncClient(limits=limits)
+
+
 def create_llm(
     model: Optional[str] = None,
     streaming: bool = False,  # kept for compatibility; we always disable transport streaming
@@ -38,6 +61,7 @@ def create_llm(
     )
 
     _ = streaming  # API 호환성 유지용 파라미터
+    http_client, http_async_client = _shared_http_clients()
     return ChatOpenAI(
         base_url=base_url,
         api_key=api_key,
@@ -47,5 +71,7 @@ def create_llm(
         disable_streaming=True,
         timeout=timeout,
         max_retries=max_retries,
+        http_client=http_client,
+        http_async_client=http_async_client,
     )
 
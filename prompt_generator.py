@@ -1,22 +1,298 @@
+import os
+import re
 import time
 import json
 import logging
 import asyncio
-import re
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any, Tuple
 from processgpt_agent_utils.tools.dmn_rule_tool import DMNRuleTool
 from processgpt_agent_utils.tools.knowledge_manager import Mem0Tool
+from utils import BoundedLRU, dumps_json
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# description 전용 시스템 프롬프트 (고정 문자열이므로 호출마다 만들지 않음)
+DESCRIPTION_SYSTEM_PROMPT = (
+    "당신은 CrewAI Task description을 작성하는 전문가입니다.\n\n"
+    "역할: 주어진 컨텍스트 정보를 바탕으로 에이전트가 수행할 구체적인 작업 지시(description)를 생성합니다.\n"
+    "핵심 원칙: 도구 실패/파일 없음 등은 작업 실패 사유가 아니며, 입력 컨텍스트만 있으면 작업 완료 가능하도록 지시를 작성합니다.\n"
+    "응답 형식: 설명 텍스트 한 문단으로만 응답하세요. 백틱/코드블록/JSON 포장 금지."
+)
+
+# expected_output 전용 시스템 프롬프트
+EXPECTED_OUTPUT_SYSTEM_PROMPT = (
+    "당신은 CrewAI Task expected_output을 작성하는 전문가입니다.\n\n"
+    "역할: 주어진 폼 정보(form_types/form_html)만을 바탕으로 결과 형식(expected_output)을 생성합니다.\n"
+    "핵심 원칙: FAILED는 오직 입력 컨텍스트가 전혀 없을 때만 사용하며, 도구 실패/파일 없음 등은 실패 사유가 아닙니다.\n"
+    "응답 형식: 오직 JSON 객체로만 응답하세요. 백틱/코드블록/문자열 포장 금지."
+)
+
+# 에이전트별 Mem0 검색/DMN 규칙 조회 동시 실행 스레드 상한
+MEM0_SEARCH_MAX_WORKERS = 16
+
+# Mem0 검색 결과 캐시: 같은 작업의 재시도/피드백 반복 시 (tenant, agent, query)가 동일하므로 재사용
+# 학습 데이터가 갱신될 수 있어 TTL을 둔다. MEM0_SEARCH_CACHE_TTL=0 이면 비활성
+MEM0_SEARCH_CACHE_TTL = float(os.getenv("MEM0_SEARCH_CACHE_TTL", "300"))
+MEM0_SEARCH_CACHE_SIZE = 1024
+MEM0_TOOL_POOL_SIZE = 64
+_mem0_cache = BoundedLRU(MEM0_SEARCH_CACHE_SIZE, ttl=MEM0_SEARCH_CACHE_TTL)
+
+
+def _mem0_cache_key(tenant_id: str, agent_id: str, query: str) -> Tuple[str, str, str]:
+    return (str(tenant_id), str(agent_id), hashlib.blake2b(query.encode("utf-8"), digest_size=16).hexdigest())
+
+
+def _mem0_cache_get(key: Tuple[str, str, str]) -> Optional[str]:
+    if MEM0_SEARCH_CACHE_TTL <= 0:
+        return None
+    return _mem0_cache.get(key)
+
+
+def _mem0_cache_put(key: Tuple[str, str, str], value: str) -> None:
+    if MEM0_SEARCH_CACHE_TTL <= 0:
+        return
+    _mem0_cache.put(key, value)
+
+
+# Mem0Tool 결과 형식: "개인지식 N (관련도: 0.xx)\n<memory>" 블록을 빈 줄로 이어 붙임
+_RE_MEM0_ITEM_BOUNDARY = re.compile(r"\n\n(?=개인지식 \d+ \(관련도)")
+
+
+def _dedupe_learned_knowledge(learned: Dict[str, str]) -> Dict[str, str]:
+    """에이전트 간/내에서 공백 정규화 후 완전히 같은 Mem0 기억은 먼저 나온 것만 남기고 제거.
+    유사도 기반 병합은 하지 않는다 ("승인이 필요함" vs "필요하지 않음", "고객사 A" vs "고객사 B" 처럼
+    문자열은 거의 같아도 다른 사실이기 때문).
+    """
+    seen = set()
+    deduped: Dict[str, str] = {}
+    for role, text in learned.items():
+        kept = []
+        for block in _RE_MEM0_ITEM_BOUNDARY.split(text):
+            header, sep, body = block.partition("\n")
+            memory = " ".join((body if sep and header.startswith("개인지식") else block).split())
+            if not memory or memory in seen:
+                continue
+            seen.add(memory)
+            kept.append(block)
+        if kept:
+            deduped[role] = "\n\n".join(kept)
+    return deduped
+
+
+def clear_mem0_search_cache() -> None:
+    """Mem0 검색 결과 캐시 비우기 (학습 데이터 갱신 직후 등)"""
+    _mem0_cache.clear()
+
+
+# 고정 시스템 메시지는 미리 만들어 두고 참조로 재사용 (매 호출 바이트 단위로 동일 → 프로바이더 프리픽스 캐시 적중)
+_SYSTEM_MESSAGES = {
+    prompt: {"role": "system", "content": prompt}
+    for prompt in (DESCRIPTION_SYSTEM_PROMPT, EXPECTED_OUTPUT_SYSTEM_PROMPT)
+}
+
+# 설명 프롬프트의 조건부 고정 블록 (호출마다 다시 조립하지 않도록 모듈 상수로 둠)
+SKILL_USAGE_ACTION_TEXT = (
+    "이 작업은 API 호출/데이터 조회/실행 등 **액션형 작업**입니다. "
+    "작업 계획 수립 및 실행 시 **반드시** 다음 순서를 따르세요: "
+    "1) **read_skill_document** 등으로 **위 스킬 ID(들)**의 문서를 **먼저** 읽고 "
+    "2) 스킬 문서에서 제시한 **실제 코드 파일/함수/엔드포인트**를 식별한 뒤 "
+    "3) 코드 실행 도구(run_shell, run_node 등)로 **실제 코드를 실행**하고 "
+    "4) 실행 결과(예: 코스피 지수, 상태 값, 응답 데이터)를 최종 결과에 포함할 것. "
+    "단순히 '어떻게 하면 되는지' 절차를 설명만 하고 실제 코드를 실행하지 않으면 작업은 **실패로 간주**됩니다. "
+    "할당된 스킬을 모두 사용/실행한 뒤에, 필요할 때만 보완용으로 find_helpful_skills를 사용할 수 있습니다."
+)
+
+SKILL_USAGE_ASSIGNED_TEXT = (
+    "작업 계획 수립 및 실행 시 **read_skill_document** 등으로 **위 스킬 ID(들)**의 문서를 "
+    "**먼저** 읽고, 그 스킬의 절차/가이드에 따라 작업할 것. "
+    "find_helpful_skills로 다른 스킬을 검색하기 **전에** 할당된 스킬을 우선 사용할 것. "
+    "(예: 할당 스킬이 global-investment-analyzer이면 read_skill_document로 해당 스킬 문서를 먼저 읽고 그 절차에 따름)"
+)
+
+SKILL_USAGE_DEFAULT_TEXT = "할당된 스킬이 없으면 필요 시 find_helpful_skills 등으로 스킬을 탐색할 수 있음."
+
+ACTION_FREE_FORM_SUCCESS_SECTION = """
+- 액션형 작업이며 별도의 form_types가 없는 자유 형식 응답인 경우, 최종 응답은 다음 조건을 모두 만족해야 합니다:
+  * 실제 도구/코드 실행 결과(예: 코스피 지수 숫자, 조회 시점, 상태 코드 등)를 포함할 것
+  * 사용한 스킬/도구 이름과 핵심 파라미터(API key 등)를 간단히 설명할 것
+  * 단순히 \"어떻게 조회/호출하면 되는지\"에 대한 절차나 계획만 설명하는 응답은 **실패**로 간주되며, 반드시 실제 조회/호출을 수행해야 함
+"""
+
+SKILL_ACTION_RULE_TEXT = """
+- **액션형 작업 + 할당 스킬 사용 필수 (🚨 핵심 규칙):**
+  * 이 작업이 API 호출/데이터 조회/외부 서비스 실행 등 액션 성격이라면, 할당된 스킬 문서는 단순 참고용이 아니라 **실제 실행 지침**입니다.
+  * 반드시 다음 순서를 따르세요: read_skill_document로 스킬 문서 읽기 → 문서에서 제시한 코드 파일/함수/엔드포인트 식별 → 코드 실행 도구(run_shell, run_node 등)로 실제 실행 → 실행 결과(예: 코스피 지수, 응답 데이터)를 최종 응답에 포함.
+  * 단순히 \"API를 이렇게 호출하면 된다\"는 식의 설명/플랜만 반환하는 것은 허용되지 않으며, 실제 호출/실행이 없으면 작업은 실패로 간주됩니다.
+  * 할당된 스킬이 있는 경우, find_helpful_skills로 시작하는 것은 금지이며, 스킬 문서 기반 실행 이후에만 보완용으로 사용할 수 있습니다.
+"""
+
+SLIDE_FORMAT_SECTION = """**슬라이드 형식 (presentation, slide 등):**
+- **구조**: 제목 슬라이드 → 목차 → 본문 슬라이드들 → 결론/질의응답 슬라이드
+- **분량**: 최소 10장 이상 구성(많을 수록 좋음)
+- **형식**: reveal.js 마크다운 형식으로 결과물 생성
+- **내용 기반**: 보고서가 있을 경우 보고서 내용을 기반으로 슬라이드 생성, 없으면 주제에 맞게 적절히 생성
+- **기술적 요구사항**:
+  * reveal.js 구문 사용 (새 슬라이드용 ---, 수직 슬라이드용 --)
+  * 불릿 포인트, 헤더, 강조 형식 적절히 활용
+  * 논리적 슬라이드 전환과 흐름
+  * 깔끔하고 전문적인 프레젠테이션 구조
+  * 적절한 경우 사용자 정보 통합(발표자 이름, 부서 등)
+- **🚨 중요한 출력 형식 규칙**:
+  * 절대로 ```markdown, ```html, ``` 같은 코드 블록으로 결과를 감싸지 마세요
+  * 마크다운 내용을 출력하세요 (코드 블록 없이)
+  * reveal.js 마크다운 구문을 그대로 사용하되, 코드 블록으로 감싸지 말 것
+  * HTML 주석이나 코드 블록 형태의 감싸기는 절대 금지
+
+"""
+
+REPORT_FORMAT_SECTION = """**리포트 형식 (report, document 등):**
+- **형식**: 마크다운(Markdown) 형식으로 결과물 생성
+- **기본 구조**: 서론 → 본론 → 결론 형식
+- **소제목과 목차**: 내용에 맞게 유연하게 적절히 알아서 생성
+- **내용 작성 원칙**:
+  * 데이터 기반 객관적 서술
+  * 논리적 흐름과 근거 제시
+  * 내용이 많을수록 좋음 (상세하고 풍부한 내용 작성)
+- **출처 표기**: 내용을 검색이나 참고 자료에서 가져왔다면 반드시 출처 명시
+  * 마크다운 링크 형식: `[출처명](URL)` 또는 각주 형식 사용
+  * 참고문헌 섹션에 모든 출처 정리
+
+"""
+
+FEEDBACK_FIRST_PRIORITY_TEXT = """🔥 1순위 - 피드백 절대 우선:
+   - 피드백 요구사항이 모든 지시사항보다 우선 (작업지시사항, 학습경험 등 모두 피드백에 종속)
+   - 피드백에서 요구한 변경사항을 정확히 이해하고 100% 적용
+   - 기존 방식/관례를 완전히 버리고 피드백이 제시한 새로운 방식으로 전환
+   - 피드백 vs 다른 지시사항 충돌 시 → 무조건 피드백 우선
+   
+   🔄 피드백 동사별 작업지시사항 재해석 규칙:
+   - 피드백 "저장" + 작업지시사항 "수정" → INSERT 작업으로 처리
+   - 피드백 "수정" + 작업지시사항 "저장" → UPDATE 작업으로 처리
+   - 피드백 "삭제" + 작업지시사항 "저장" → DELETE 작업으로 처리
+   - 피드백 "조회" + 작업지시사항 "저장" → SELECT 작업으로 처리
+   - 여러가지 동사가 있으면 피드백의 동사가 실제 수행할 작업 유형을 최종 결정
+   - 피드백의 동사가 실제 수행할 작업 유형을 최종 결정"""
+
+SECOND_PRIORITY_FEEDBACK_TEXT = """2순위 - DMN 규칙 우선 활용 및 학습된 경험 참고:
+   - 피드백 범위 내에서 DMN 규칙을 최우선으로 활용하여 규칙 기반 추론 수행하고, 학습된 경험을 보조적으로 참고하여 더 완벽하게 처리
+   - DMN 규칙이 있으면 반드시 그 규칙을 기반으로 모든 추론과 결정을 수행하고, 피드백이 요구하는 방향성을 유지하면서 경험으로 디테일 보완"""
+
+SECOND_PRIORITY_LEARNED_TEXT = """2순위 - DMN 규칙 우선 활용 및 학습된 경험 참고:
+   - 작업지시사항은 그대로 하되, DMN 규칙을 최우선으로 활용하여 규칙 기반 추론 수행하고, 학습된 경험을 보조적으로 참고해서 더 디테일하고 완벽하게 처리
+   - DMN 규칙이 있으면 반드시 그 규칙을 기반으로 모든 추론과 결정을 수행하고, 경험에서 얻은 노하우로 품질과 정확성 향상"""
+
+SECOND_PRIORITY_DEFAULT_TEXT = """2순위 - DMN 규칙 우선 활용 및 일반 배경지식 참고:
+   - DMN 규칙을 최우선으로 활용하여 규칙 기반 추론 수행하고, 일반 배경지식을 보조적으로 참고
+   - DMN 규칙이 있으면 반드시 그 규칙을 기반으로 모든 추론과 결정을 수행"""
+
+# 한국어/영어 공통 액션성 키워드 (조회/실행/호출/저장/전송 등)
+ACTION_KEYWORDS = (
+    "조회", "호출", "실행", "보내줘", "보내 줘", "전송", "발송",
+    "저장", "수정", "삭제", "등록", "추가", "생성",
+    "call", "invoke", "execute", "run", "fetch", "query",
+)
+API_INDICATORS = (
+    "api", "엔드포인트", "endpoint", "rest", "http", "https",
+    "토큰", "token", "키:", "key:", "access_token",
+)
+
+# 선택: 프로바이더 프롬프트 캐시 버킷 키 접두사 (OpenAI prompt_cache_key)
+# - 시스템 프롬프트와 "[ROLE=...]" 머리말이 매 호출 동일하므로 역할별로 같은 캐시 버킷에 묶는다.
+# - 프록시 뒤 모델이 이 파라미터를 지원할 때만 설정 (미설정 시 전송하지 않음)
+PROMPT_CACHE_KEY_PREFIX = os.getenv("PROMPT_CACHE_KEY_PREFIX", "").strip()
+
+
+# 같은 작업이 재시도/재실행되면 프롬프트가 바이트 단위로 동일하므로 응답을 재사용 (정확 일치 LRU)
+# PROMPT_RESPONSE_CACHE_SIZE=0 이면 비활성
+PROMPT_RESPONSE_CACHE_SIZE = int(os.getenv("PROMPT_RESPONSE_CACHE_SIZE", "128"))
+_response_cache = BoundedLRU(PROMPT_RESPONSE_CACHE_SIZE)
+
+# 입력이 같은 generate_task_prompt 재호출(재시도/재실행)은 Mem0/DMN 조회와 브리프 조립까지 건너뛰도록
+# (description, expected_output) 결과를 입력 해시로 캐시. Mem0 학습 내용이 바뀔 수 있으므로 TTL은 Mem0 캐시와 동일
+_task_prompt_cache = BoundedLRU(PROMPT_RESPONSE_CACHE_SIZE, ttl=MEM0_SEARCH_CACHE_TTL)
+
+
+def _task_prompt_cache_key(llm, *inputs: Any) -> str:
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or ""
+    payload = json.dumps([str(model), *inputs], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# 프롬프트에 그대로 싣는 가변 입력(피드백/학습 결과/DMN/소스/폼 HTML) 섹션별 최대 글자 수
+# 과대 입력이 컨텍스트 한도를 넘겨 400 → 재시도로 이어지지 않도록 앞/뒤를 보존해 가운데를 자름 (0이면 비활성)
+PROMPT_SECTION_MAX_CHARS = int(os.getenv("PROMPT_SECTION_MAX_CHARS", "40000"))
+_TRUNCATION_MARKER = "\n...[중략]...\n"
+
+
+def _truncate_middle(text: str, max_chars: int = PROMPT_SECTION_MAX_CHARS) -> str:
+    """max_chars를 넘으면 앞 2/3, 뒤 1/3만 남기고 가운데를 생략 표시로 대체"""
+    if max_chars <= 0 or not text or len(text) <= max_chars:
+        return text
+    keep = max(max_chars - len(_TRUNCATION_MARKER), 0)
+    head = keep * 2 // 3
+    tail = keep - head
+    logger.warning("✂️ 프롬프트 입력 축약 - %d → %d chars", len(text), max_chars)
+    return text[:head] + _TRUNCATION_MARKER + (text[-tail:] if tail else "")
+
+
+def _response_cache_key(llm, system_prompt: str, user_prompt: str) -> str:
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or ""
+    h = hashlib.blake2b(digest_size=16)
+    for part in (str(model), system_prompt, user_prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+async def _ainvoke_text(llm, system_prompt: str, user_prompt: str, cache_role: str = "") -> str:
+    """LLM을 호출해 순수 텍스트 응답을 받아요"""
+
+    cache_key = None
+    if PROMPT_RESPONSE_CACHE_SIZE > 0:
+        cache_key = _response_cache_key(llm, system_prompt, user_prompt)
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("♻️ LLM 응답 캐시 적중 - %d chars", len(cached))
+            return cached
+
+    start_time = time.time()
+    kwargs = {}
+    if PROMPT_CACHE_KEY_PREFIX and cache_role:
+        kwargs["extra_body"] = {"prompt_cache_key": f"{PROMPT_CACHE_KEY_PREFIX}-{cache_role}"}
+    system_message = _SYSTEM_MESSAGES.get(system_prompt) or {"role": "system", "content": system_prompt}
+    response = await llm.ainvoke([system_message, {"role": "user", "content": user_prompt}], **kwargs)
+    raw = getattr(response, "content", response)
+    text = "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in raw) if isinstance(raw, list) else str(raw)
+    text = (text or "").strip()
+    logger.info("📝 LLM(ainvoke) 완료 - %.2fs, %d chars", time.time() - start_time, len(text))
+    if not text:
+        logger.error("❌ LLM 빈 응답 수신: system_prompt 길이=%d, user_prompt 길이=%d", len(system_prompt), len(user_prompt), exc_info=False)
+        raise ValueError("Empty response from LLM")
+    if cache_key is not None:
+        _response_cache.put(cache_key, text)
+    return text
+
 
 class DynamicPromptGenerator:
     """동적 프롬프트 생성기 주어진 입력들을 바탕으로 Task용 description과 expected_output을 생성합니다."""
 
+    # Mem0Tool은 생성 시 mem0 Memory(벡터 스토어 DB 연결)를 초기화하므로 (tenant_id, agent_id)별로 재사용
+    # 생성기는 작업마다 새로 만들어지므로 클래스 속성으로 프로세스 전역 공유 (LRU, 최대 MEM0_TOOL_POOL_SIZE개)
+    _mem0_pool = BoundedLRU(MEM0_TOOL_POOL_SIZE)
+
     def __init__(self, llm):
         self.llm = llm
 
+    @classmethod
+    def _get_mem0_tool(cls, tenant_id: str, agent_id: str) -> Mem0Tool:
+        return cls._mem0_pool.get_or_create(
+            (str(tenant_id), str(agent_id)),
+            lambda: Mem0Tool(tenant_id=tenant_id, user_id=agent_id),
+        )
+
 
     async def generate_task_prompt(
         self,
@@ -32,18 +308,36 @@ class DynamicPromptGenerator:
     ) -> Tuple[str, str]:
         """두 LLM 호출로 설명/결과물을 분리 생성하고 asyncio.gather로 병렬 실행."""
 
+        # 입력 정규화는 진입 시 한 번만 (이후 단계는 정규화된 값을 그대로 사용)
+        feedback_summary = (feedback_summary or "").strip()
+
+        cache_key = None
+        if PROMPT_RESPONSE_CACHE_SIZE > 0 and MEM0_SEARCH_CACHE_TTL > 0:
+            cache_key = _task_prompt_cache_key(
+                self.llm, task_instructions, agent_info, form_types, form_html, feedback_summary,
+                current_activity_name, user_info, sources, tool_priority_order,
+            )
+            cached = _task_prompt_cache.get(cache_key)
+            if cached is not None:
+                logger.info("♻️ Task 프롬프트 캐시 적중 - Mem0/DMN 조회 및 LLM 호출 생략")
+                return cached
+
         # 작업 지시사항 기반 액션성 여부 간단 분류
         is_action_like = self._is_action_like(task_instructions)
 
-        learned_knowledge = self._collect_learned_knowledge(
-            agent_info=agent_info,
-            task_instructions=task_instructions,
-            feedback_summary=feedback_summary,
-        )
-
-        dmn_analysis = self._collect_dmn_analysis(
-            agent_info=agent_info,
-            task_instructions=task_instructions,
+        # Mem0/DMN 조회는 동기 네트워크 I/O → 이벤트 루프를 막지 않도록 스레드에서 두 조회를 동시에 실행
+        (learned_knowledge, mem0_failed), (dmn_analysis, dmn_failed) = await asyncio.gather(
+            asyncio.to_thread(
+                self._collect_learned_knowledge,
+                agent_info=agent_info,
+                task_instructions=task_instructions,
+                feedback_summary=feedback_summary,
+            ),
+            asyncio.to_thread(
+                self._collect_dmn_analysis,
+                agent_info=agent_info,
+                task_instructions=task_instructions,
+            ),
         )
 
         # 설명용 브리프: 폼 정보 제외
@@ -67,32 +361,26 @@ class DynamicPromptGenerator:
             form_html=form_html,
         )
 
-        description_system = self._build_system_prompt_description()
-        expected_system = self._build_system_prompt_expected_output()
+        requests = (
+            (DESCRIPTION_SYSTEM_PROMPT, f"[ROLE=description]\n{desc_brief}\n설명만 한 문단으로.", "description"),
+            (EXPECTED_OUTPUT_SYSTEM_PROMPT, f"[ROLE=expected_output]\n{expected_brief}", "expected_output"),
+        )
 
-        async def ainvoke_text(system_prompt: str, user_prompt: str) -> str:
-            """LLM을 호출해 순수 텍스트 응답을 받아요"""
-            
-            start_time = time.time()
-            response = await self.llm.ainvoke([
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ])
-            raw = getattr(response, "content", response)
-            text = "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in raw) if isinstance(raw, list) else str(raw)
-            text = (text or "").strip()
-            logger.info("📝 LLM(ainvoke) 완료 - %.2fs, %d chars", time.time() - start_time, len(text))
-            if not text:
-                logger.error("❌ LLM 빈 응답 수신: system_prompt 길이=%d, user_prompt 길이=%d", len(system_prompt), len(user_prompt), exc_info=False)
-                raise ValueError("Empty response from LLM")
-            return text
-
-        desc_task = asyncio.create_task(ainvoke_text(description_system, f"[ROLE=description]\n{desc_brief}\n설명만 한 문단으로."))
-        out_task  = asyncio.create_task(ainvoke_text(expected_system, f"[ROLE=expected_output]\n{expected_brief}"))
-        
         try:
-            description, expected_output = await asyncio.gather(desc_task, out_task)
+            # 한쪽 실패가 다른 쪽 진행 중 호출을 취소하지 않도록 return_exceptions=True
+            # 실패한 쪽만 한 번 더 호출하고, 이미 받은 응답은 그대로 사용
+            results = await asyncio.gather(*(_ainvoke_text(self.llm, *req) for req in requests), return_exceptions=True)
+            for i, result in enumerate(results):
+                if isinstance(result, BaseException):
+                    if not isinstance(result, Exception):
+                        raise result
+                    logger.warning("⚠️ %s 생성 실패 - 해당 호출만 재시도: %s", requests[i][2], result)
+                    results[i] = await _ainvoke_text(self.llm, *requests[i])
+            description, expected_output = results
             logger.info("✅ 비동기 분리 프롬프트 생성 완료")
+            # 조회 실패로 학습 지식/DMN 규칙이 빠진 프롬프트는 캐시하지 않음 (재시도 시 다시 조회)
+            if cache_key is not None and not (mem0_failed or dmn_failed):
+                _task_prompt_cache.put(cache_key, (description, expected_output))
             return description, expected_output
         except Exception as e:
             logger.error("❌ 동적 Task description/expected_output 생성 실패(raise): %s", e, exc_info=True)
@@ -109,25 +397,11 @@ class DynamicPromptGenerator:
         text = task_instructions.strip()
         lower = text.lower()
 
-        # 한국어/영어 공통 액션성 키워드 (조회/실행/호출/저장/전송 등)
-        action_keywords = [
-            "조회", "호출", "실행", "보내줘", "보내 줘", "전송", "발송",
-            "저장", "수정", "삭제", "등록", "추가", "생성",
-            "call", "invoke", "execute", "run", "fetch", "query",
-        ]
-        api_indicators = [
-            "api", "엔드포인트", "endpoint", "rest", "http", "https",
-            "토큰", "token", "키:", "key:", "access_token",
-        ]
-
         # 단순 키워드 매칭
-        if any(kw in text for kw in action_keywords):
+        # (코스피/환율/지수 "조회" 같은 금융 데이터 패턴도 조회/query/fetch 키워드로 여기서 걸러짐)
+        if any(kw in text for kw in ACTION_KEYWORDS):
             return True
-        if any(kw in lower for kw in api_indicators):
-            return True
-
-        # 코스피/환율/지수 조회 등 금융 데이터 패턴
-        if re.search(r"(코스피|지수|환율|주가).*(조회|query|fetch)", text):
+        if any(kw in lower for kw in API_INDICATORS):
             return True
 
         return False
@@ -137,32 +411,48 @@ class DynamicPromptGenerator:
         agent_info: List[Dict],
         task_instructions: str,
         feedback_summary: str,
-    ) -> Dict[str, str]:
-        """에이전트별 관련 학습 내용 수집"""
+    ) -> Tuple[Dict[str, str], bool]:
+        """에이전트별 관련 학습 내용 수집. (결과, 일부 조회 실패 여부) 반환"""
         if not task_instructions or not task_instructions.strip():
-            return {}
+            return {}, False
 
-        query = f"{task_instructions.strip()}\n{feedback_summary.strip()}"
-        logger.info("🧠 mem0 사전 훈련 데이터 검색 시작")
+        # Mem0 자격(id+tenant_id)이 있는 에이전트가 없으면 쿼리 조립/로그/스레드 풀 모두 생략
+        valid_agents = [ag for ag in agent_info if ag.get("id") and ag.get("tenant_id")]
+        if not valid_agents:
+            return {}, False
 
-        learned: Dict[str, str] = {}
-        for ag in agent_info:
-            agent_id = ag.get("id")
-            tenant_id = ag.get("tenant_id")
-            role = ag.get("role", "Unknown")
-
-            if not (agent_id and tenant_id):
-                continue
+        # feedback_summary 는 generate_task_prompt 진입 시 이미 정규화됨
+        query = f"{task_instructions.strip()}\n{feedback_summary}"
+        logger.info("🧠 mem0 사전 훈련 데이터 검색 시작 - 대상 에이전트 %d명", len(valid_agents))
 
+        def _search_one(ag: Dict) -> Tuple[str, Optional[str], bool]:
+            role = ag.get("role", "Unknown")
+            cache_key = _mem0_cache_key(ag["tenant_id"], ag["id"], query)
+            cached = _mem0_cache_get(cache_key)
+            if cached is not None:
+                return role, cached, False
             try:
-                mem0_tool = Mem0Tool(tenant_id=tenant_id, user_id=agent_id)
+                mem0_tool = self._get_mem0_tool(ag["tenant_id"], ag["id"])
                 result = mem0_tool._run(query)
-                if result and "지식이 없습니다" not in result:
-                    learned[role] = result
+                if isinstance(result, str):
+                    _mem0_cache_put(cache_key, result)
+                return role, result, False
             except Exception as e:
                 logger.warning("⚠️ 에이전트 %s 메모리 검색 실패: %s", role, e)
+                return role, None, True
 
-        return learned
+        # 에이전트별 검색은 서로 독립적인 네트워크 I/O → 스레드로 동시에 보내 N·RTT를 ~1·RTT로
+        # (map은 입력 순서를 유지하므로 같은 role이 겹칠 때 뒤 에이전트가 이기는 기존 동작 유지)
+        with ThreadPoolExecutor(max_workers=min(MEM0_SEARCH_MAX_WORKERS, len(valid_agents))) as pool:
+            results = list(pool.map(_search_one, valid_agents))
+
+        learned: Dict[str, str] = {}
+        for role, result, _ in results:
+            if result and "지식이 없습니다" not in result:
+                learned[role] = result
+
+        # 에이전트들이 같은 사실을 중복 기억하는 경우가 많아 프롬프트 토큰 절약을 위해 병합
+        return _dedupe_learned_knowledge(learned), any(failed for _, _, failed in results)
 
 
     def _build_description_prompt(
@@ -181,7 +471,8 @@ class DynamicPromptGenerator:
     ) -> str:
         """설명 프롬프트: form_types/form_html 제외, 나머지 컨텍스트를 원문 스타일로 포함."""
         
-        has_feedback = bool(feedback_summary and feedback_summary.strip() and feedback_summary.strip() != '없음')
+        # feedback_summary 는 generate_task_prompt 진입 시 이미 정규화됨
+        has_feedback = bool(feedback_summary) and feedback_summary != '없음'
         has_learned = bool(learned_knowledge and any(str(v).strip() for v in learned_knowledge.values()))
         has_dmn = bool(dmn_analysis and any(str(v).strip() for v in dmn_analysis.values()))
         has_skills = bool(agent_info and any(ag.get("skills") for ag in agent_info))  # agent_info["skills"] 보유 시 스킬 도구 1순위
@@ -201,27 +492,11 @@ class DynamicPromptGenerator:
 
         # 액션형 작업에서의 스킬 활용 설명 텍스트
         if has_assigned_skills and is_action_like:
-            skill_usage_text = (
-                "이 작업은 API 호출/데이터 조회/실행 등 **액션형 작업**입니다. "
-                "작업 계획 수립 및 실행 시 **반드시** 다음 순서를 따르세요: "
-                "1) **read_skill_document** 등으로 **위 스킬 ID(들)**의 문서를 **먼저** 읽고 "
-                "2) 스킬 문서에서 제시한 **실제 코드 파일/함수/엔드포인트**를 식별한 뒤 "
-                "3) 코드 실행 도구(run_shell, run_node 등)로 **실제 코드를 실행**하고 "
-                "4) 실행 결과(예: 코스피 지수, 상태 값, 응답 데이터)를 최종 결과에 포함할 것. "
-                "단순히 '어떻게 하면 되는지' 절차를 설명만 하고 실제 코드를 실행하지 않으면 작업은 **실패로 간주**됩니다. "
-                "할당된 스킬을 모두 사용/실행한 뒤에, 필요할 때만 보완용으로 find_helpful_skills를 사용할 수 있습니다."
-            )
+            skill_usage_text = SKILL_USAGE_ACTION_TEXT
         elif has_assigned_skills:
-            skill_usage_text = (
-                "작업 계획 수립 및 실행 시 **read_skill_document** 등으로 **위 스킬 ID(들)**의 문서를 "
-                "**먼저** 읽고, 그 스킬의 절차/가이드에 따라 작업할 것. "
-                "find_helpful_skills로 다른 스킬을 검색하기 **전에** 할당된 스킬을 우선 사용할 것. "
-                "(예: 할당 스킬이 global-investment-analyzer이면 read_skill_document로 해당 스킬 문서를 먼저 읽고 그 절차에 따름)"
-            )
+            skill_usage_text = SKILL_USAGE_ASSIGNED_TEXT
         else:
-            skill_usage_text = (
-                "할당된 스킬이 없으면 필요 시 find_helpful_skills 등으로 스킬을 탐색할 수 있음."
-            )
+            skill_usage_text = SKILL_USAGE_DEFAULT_TEXT
 
         # 도구 우선순위 문구: 사용자 지정이 있으면 그대로 반영, 없으면 기본 문구
         # claude-skills/computer-use는 프롬프트에 "할당된 스킬"로 표시(스킬명이 저장 포맷으로 오면 그대로 사용)
@@ -243,32 +518,21 @@ class DynamicPromptGenerator:
         # 액션형 + 자유 형식(free-form)일 때 추가 성공 기준 안내
         is_free_form = not bool(form_types)
         if is_action_like and is_free_form:
-            action_success_section = """
-- 액션형 작업이며 별도의 form_types가 없는 자유 형식 응답인 경우, 최종 응답은 다음 조건을 모두 만족해야 합니다:
-  * 실제 도구/코드 실행 결과(예: 코스피 지수 숫자, 조회 시점, 상태 코드 등)를 포함할 것
-  * 사용한 스킬/도구 이름과 핵심 파라미터(API key 등)를 간단히 설명할 것
-  * 단순히 \"어떻게 조회/호출하면 되는지\"에 대한 절차나 계획만 설명하는 응답은 **실패**로 간주되며, 반드시 실제 조회/호출을 수행해야 함
-"""
+            action_success_section = ACTION_FREE_FORM_SUCCESS_SECTION
         else:
             action_success_section = ""
 
         # 액션형 + 스킬 보유 시 도구 활용 섹션에 추가로 명시할 규칙
         if is_action_like and has_assigned_skills:
-            skill_action_rule_text = """
-- **액션형 작업 + 할당 스킬 사용 필수 (🚨 핵심 규칙):**
-  * 이 작업이 API 호출/데이터 조회/외부 서비스 실행 등 액션 성격이라면, 할당된 스킬 문서는 단순 참고용이 아니라 **실제 실행 지침**입니다.
-  * 반드시 다음 순서를 따르세요: read_skill_document로 스킬 문서 읽기 → 문서에서 제시한 코드 파일/함수/엔드포인트 식별 → 코드 실행 도구(run_shell, run_node 등)로 실제 실행 → 실행 결과(예: 코스피 지수, 응답 데이터)를 최종 응답에 포함.
-  * 단순히 \"API를 이렇게 호출하면 된다\"는 식의 설명/플랜만 반환하는 것은 허용되지 않으며, 실제 호출/실행이 없으면 작업은 실패로 간주됩니다.
-  * 할당된 스킬이 있는 경우, find_helpful_skills로 시작하는 것은 금지이며, 스킬 문서 기반 실행 이후에만 보완용으로 사용할 수 있습니다.
-"""
+            skill_action_rule_text = SKILL_ACTION_RULE_TEXT
         else:
             skill_action_rule_text = ""
 
-        agent_info_json = json.dumps(agent_info or [], ensure_ascii=False, indent=2) if agent_info else '정보 없음'
-        user_info_json = json.dumps(user_info or [], ensure_ascii=False, indent=2) if user_info else '정보 없음'
-        learned_json = json.dumps(learned_knowledge or {}, ensure_ascii=False, indent=2) if has_learned else '관련 경험 없음'
-        dmn_json = json.dumps(dmn_analysis or {}, ensure_ascii=False, indent=2) if has_dmn else '관련 규칙 분석 없음'
-        sources_json = json.dumps(sources or [], ensure_ascii=False, indent=2) if sources else '소스 파일 없음'
+        agent_info_json = dumps_json(agent_info or [], indent=True) if agent_info else '정보 없음'
+        user_info_json = dumps_json(user_info or [], indent=True) if user_info else '정보 없음'
+        learned_json = _truncate_middle(dumps_json(learned_knowledge or {}, indent=True)) if has_learned else '관련 경험 없음'
+        dmn_json = _truncate_middle(dumps_json(dmn_analysis or {}, indent=True)) if has_dmn else '관련 규칙 분석 없음'
+        sources_json = _truncate_middle(dumps_json(sources or [], indent=True)) if sources else '소스 파일 없음'
         # agent_info에서 실제 agent_id와 tenant_id 추출
         agent_context_info = []
         if agent_info:
@@ -300,68 +564,21 @@ class DynamicPromptGenerator:
                             has_report_type = True
         
         # 슬라이드와 리포트 형식 섹션 내용 생성
-        slide_section = """**슬라이드 형식 (presentation, slide 등):**
-- **구조**: 제목 슬라이드 → 목차 → 본문 슬라이드들 → 결론/질의응답 슬라이드
-- **분량**: 최소 10장 이상 구성(많을 수록 좋음)
-- **형식**: reveal.js 마크다운 형식으로 결과물 생성
-- **내용 기반**: 보고서가 있을 경우 보고서 내용을 기반으로 슬라이드 생성, 없으면 주제에 맞게 적절히 생성
-- **기술적 요구사항**:
-  * reveal.js 구문 사용 (새 슬라이드용 ---, 수직 슬라이드용 --)
-  * 불릿 포인트, 헤더, 강조 형식 적절히 활용
-  * 논리적 슬라이드 전환과 흐름
-  * 깔끔하고 전문적인 프레젠테이션 구조
-  * 적절한 경우 사용자 정보 통합(발표자 이름, 부서 등)
-- **🚨 중요한 출력 형식 규칙**:
-  * 절대로 ```markdown, ```html, ``` 같은 코드 블록으로 결과를 감싸지 마세요
-  * 마크다운 내용을 출력하세요 (코드 블록 없이)
-  * reveal.js 마크다운 구문을 그대로 사용하되, 코드 블록으로 감싸지 말 것
-  * HTML 주석이나 코드 블록 형태의 감싸기는 절대 금지
-
-""" if has_slide_type else ""
+        slide_section = SLIDE_FORMAT_SECTION if has_slide_type else ""
         
-        report_section = """**리포트 형식 (report, document 등):**
-- **형식**: 마크다운(Markdown) 형식으로 결과물 생성
-- **기본 구조**: 서론 → 본론 → 결론 형식
-- **소제목과 목차**: 내용에 맞게 유연하게 적절히 알아서 생성
-- **내용 작성 원칙**:
-  * 데이터 기반 객관적 서술
-  * 논리적 흐름과 근거 제시
-  * 내용이 많을수록 좋음 (상세하고 풍부한 내용 작성)
-- **출처 표기**: 내용을 검색이나 참고 자료에서 가져왔다면 반드시 출처 명시
-  * 마크다운 링크 형식: `[출처명](URL)` 또는 각주 형식 사용
-  * 참고문헌 섹션에 모든 출처 정리
-
-""" if has_report_type else ""
+        report_section = REPORT_FORMAT_SECTION if has_report_type else ""
 
         if has_feedback:
-            first_priority_text = """🔥 1순위 - 피드백 절대 우선:
-   - 피드백 요구사항이 모든 지시사항보다 우선 (작업지시사항, 학습경험 등 모두 피드백에 종속)
-   - 피드백에서 요구한 변경사항을 정확히 이해하고 100% 적용
-   - 기존 방식/관례를 완전히 버리고 피드백이 제시한 새로운 방식으로 전환
-   - 피드백 vs 다른 지시사항 충돌 시 → 무조건 피드백 우선
-   
-   🔄 피드백 동사별 작업지시사항 재해석 규칙:
-   - 피드백 "저장" + 작업지시사항 "수정" → INSERT 작업으로 처리
-   - 피드백 "수정" + 작업지시사항 "저장" → UPDATE 작업으로 처리
-   - 피드백 "삭제" + 작업지시사항 "저장" → DELETE 작업으로 처리
-   - 피드백 "조회" + 작업지시사항 "저장" → SELECT 작업으로 처리
-   - 여러가지 동사가 있으면 피드백의 동사가 실제 수행할 작업 유형을 최종 결정
-   - 피드백의 동사가 실제 수행할 작업 유형을 최종 결정"""
+            first_priority_text = FEEDBACK_FIRST_PRIORITY_TEXT
         else:
             first_priority_text = "1순위 - 작업지시사항 그대로 수행"
 
         if has_learned and has_feedback:
-            second_priority_text = """2순위 - DMN 규칙 우선 활용 및 학습된 경험 참고:
-   - 피드백 범위 내에서 DMN 규칙을 최우선으로 활용하여 규칙 기반 추론 수행하고, 학습된 경험을 보조적으로 참고하여 더 완벽하게 처리
-   - DMN 규칙이 있으면 반드시 그 규칙을 기반으로 모든 추론과 결정을 수행하고, 피드백이 요구하는 방향성을 유지하면서 경험으로 디테일 보완"""
+            second_priority_text = SECOND_PRIORITY_FEEDBACK_TEXT
         elif has_learned:
-            second_priority_text = """2순위 - DMN 규칙 우선 활용 및 학습된 경험 참고:
-   - 작업지시사항은 그대로 하되, DMN 규칙을 최우선으로 활용하여 규칙 기반 추론 수행하고, 학습된 경험을 보조적으로 참고해서 더 디테일하고 완벽하게 처리
-   - DMN 규칙이 있으면 반드시 그 규칙을 기반으로 모든 추론과 결정을 수행하고, 경험에서 얻은 노하우로 품질과 정확성 향상"""
+            second_priority_text = SECOND_PRIORITY_LEARNED_TEXT
         else:
-            second_priority_text = """2순위 - DMN 규칙 우선 활용 및 일반 배경지식 참고:
-   - DMN 규칙을 최우선으로 활용하여 규칙 기반 추론 수행하고, 일반 배경지식을 보조적으로 참고
-   - DMN 규칙이 있으면 반드시 그 규칙을 기반으로 모든 추론과 결정을 수행"""
+            second_priority_text = SECOND_PRIORITY_DEFAULT_TEXT
 
         return f"""
 다음 정보를 바탕으로 CrewAI Task description 프롬프트를 생성하세요:
@@ -405,7 +622,7 @@ class DynamicPromptGenerator:
 - 활용: 작업지시사항 해석 및 원자 작업 도출 시 규칙으로 추론된 결과를 최우선으로 반영
 
 **피드백 (feedback_summary):**
-- 값: {feedback_summary if has_feedback else '없음'}
+- 값: {_truncate_middle(feedback_summary) if has_feedback else '없음'}
 - 역할: 이전 작업에 대한 수정 요구사항 (최고 우선순위)
 - 활용: 모든 다른 지시사항보다 우선하여 작업 방향과 방법을 결정
 {f'- 🔥 최우선: 피드백이 있으면 모든 작업은 이 피드백 내용에 따라 재정의됨' if has_feedback else ''}
@@ -563,7 +780,7 @@ class DynamicPromptGenerator:
                             "type": field_type
                         })
 
-        form_fields_json = json.dumps(form_fields, ensure_ascii=False, indent=2) if form_fields else '특별한 형식 제약 없음'
+        form_fields_json = dumps_json(form_fields, indent=True) if form_fields else '특별한 형식 제약 없음'
         multidata_notice = (
             '- 🚨 다중 데이터 모드: is_multidata_mode="true" 속성이 있으면 해당 필드는 배열 형태로 반환해야 함\n\n'
             if is_multidata_mode else ''
@@ -602,7 +819,7 @@ class DynamicPromptGenerator:
             "=== 📋 폼 섹션 (expected_output 전용) ===\n\n"
             "섹션 1) 폼 형식(form_types)\n"
             f"- 값(필드 정의): {form_fields_json}\n"
-            f"- 값(HTML): {form_html_text if form_html_text else '없음'}\n"
+            f"- 값(HTML): {_truncate_middle(form_html_text) if form_html_text else '없음'}\n"
             "- 역할: 최종 결과물의 구조와 필드 정의, 선택형 항목(items) 제공\n"
             "- 활용: expected_output 구조 설계와 폼_데이터 키/값 결정에 사용\n"
             "- 🚨🚨🚨 절대 규칙: 폼_데이터의 키는 반드시 form_fields의 'key' 값을 사용 (절대 'text' 값 사용 금지!)\n"
@@ -720,46 +937,36 @@ class DynamicPromptGenerator:
             f"{report_slide_notice}"
         )
 
-    def _build_system_prompt_description(self) -> str:
-        """description 전용 시스템 프롬프트 생성"""
-        return (
-            "당신은 CrewAI Task description을 작성하는 전문가입니다.\n\n"
-            "역할: 주어진 컨텍스트 정보를 바탕으로 에이전트가 수행할 구체적인 작업 지시(description)를 생성합니다.\n"
-            "핵심 원칙: 도구 실패/파일 없음 등은 작업 실패 사유가 아니며, 입력 컨텍스트만 있으면 작업 완료 가능하도록 지시를 작성합니다.\n"
-            "응답 형식: 설명 텍스트 한 문단으로만 응답하세요. 백틱/코드블록/JSON 포장 금지."
-        )
-
-    def _build_system_prompt_expected_output(self) -> str:
-        """expected_output 전용 시스템 프롬프트 생성"""
-        return (
-            "당신은 CrewAI Task expected_output을 작성하는 전문가입니다.\n\n"
-            "역할: 주어진 폼 정보(form_types/form_html)만을 바탕으로 결과 형식(expected_output)을 생성합니다.\n"
-            "핵심 원칙: FAILED는 오직 입력 컨텍스트가 전혀 없을 때만 사용하며, 도구 실패/파일 없음 등은 실패 사유가 아닙니다.\n"
-            "응답 형식: 오직 JSON 객체로만 응답하세요. 백틱/코드블록/문자열 포장 금지."
-        )
-    
     def _collect_dmn_analysis(
         self,
         agent_info: List[Dict],
         task_instructions: str,
-    ) -> Dict[str, str]:
-        """에이전트별 DMN 규칙 분석 결과 수집: task_instructions를 dmn_rule 쿼리로 사용"""
+    ) -> Tuple[Dict[str, str], bool]:
+        """에이전트별 DMN 규칙 분석 결과 수집: task_instructions를 dmn_rule 쿼리로 사용. (결과, 일부 조회 실패 여부) 반환"""
         if not task_instructions or not task_instructions.strip():
-            return {}
+            return {}, False
 
-        dmn_results: Dict[str, str] = {}
-        for ag in agent_info:
-            agent_id = ag.get("id") or ag.get("user_id")
-            tenant_id = ag.get("tenant_id")
+        query = task_instructions.strip()
+        valid_agents = [ag for ag in agent_info if (ag.get("id") or ag.get("user_id")) and ag.get("tenant_id")]
+        if not valid_agents:
+            return {}, False
+
+        def _analyze_one(ag: Dict) -> Tuple[str, Optional[str], bool]:
             role = ag.get("role", "Unknown")
-            if not (agent_id and tenant_id):
-                continue
             try:
-                tool = DMNRuleTool(tenant_id=tenant_id, user_id=agent_id)
-                result = tool._run(task_instructions.strip())
-                if result and isinstance(result, str):
-                    dmn_results[role] = result
+                tool = DMNRuleTool(tenant_id=ag["tenant_id"], user_id=ag.get("id") or ag.get("user_id"))
+                return role, tool._run(query), False
             except Exception as e:
                 logger.warning("⚠️ 에이전트 %s DMN 규칙 분석 실패: %s", role, e)
+                return role, None, True
+
+        # Mem0 검색과 같은 방식으로 에이전트별 규칙 조회를 동시에 실행 (결과는 입력 순서대로 병합)
+        with ThreadPoolExecutor(max_workers=min(MEM0_SEARCH_MAX_WORKERS, len(valid_agents))) as pool:
+            results = list(pool.map(_analyze_one, valid_agents))
+
+        dmn_results: Dict[str, str] = {}
+        for role, result, _ in results:
+            if result and isinstance(result, str):
+                dmn_results[role] = result
 
-        return dmn_results
\ No newline at end of file
+        return dmn_results, any(failed for _, _, failed in results)
\ No newline at end of file
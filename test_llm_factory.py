@@ -29,6 +29,17 @@ class TestLLM(unittest.TestCase):
         self.assertFalse(called_kwargs["streaming"])
         self.assertTrue(called_kwargs["disable_streaming"])
 
+    @patch("langchain_openai.ChatOpenAI")
+    def test_http_clients_are_shared(self, mock_chat_openai):
+        mock_chat_openai.return_value = object()
+
+        llm.create_llm(model="gpt-4o")
+        llm.create_llm(model="gpt-4o-mini")
+
+        first, second = (c.kwargs for c in mock_chat_openai.call_args_list)
+        self.assertIs(first["http_client"], second["http_client"])
+        self.assertIs(first["http_async_client"], second["http_async_client"])
+
     @patch("langchain_openai.ChatOpenAI")
     def test_default_model_from_env(self, mock_chat_openai):
         mock_chat_openai.return_value = object()
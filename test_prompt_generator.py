@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import Mock, patch
+
+import prompt_generator
+
+
+class TestDedupeLearnedKnowledge(unittest.TestCase):
+    def test_exact_duplicates_across_agents_are_dropped(self):
+        learned = {
+            "회계": "개인지식 1 (관련도: 0.91)\n출장비 한도는  500만원",
+            "총무": "개인지식 1 (관련도: 0.88)\n출장비 한도는 500만원\n\n개인지식 2 (관련도: 0.80)\n법인카드 사용",
+        }
+        self.assertEqual(
+            prompt_generator._dedupe_learned_knowledge(learned),
+            {
+                "회계": "개인지식 1 (관련도: 0.91)\n출장비 한도는  500만원",
+                "총무": "개인지식 2 (관련도: 0.80)\n법인카드 사용",
+            },
+        )
+
+    def test_similar_but_different_facts_are_kept(self):
+        learned = {
+            "인사": "휴가 신청은 팀장 승인이 필요합니다",
+            "총무": "휴가 신청은 팀장 승인이 필요하지 않습니다",
+            "영업": "고객사 A는 월요일 배송을 선호함",
+            "물류": "고객사 B는 월요일 배송을 선호함",
+        }
+        self.assertEqual(prompt_generator._dedupe_learned_knowledge(learned), learned)
+
+
+
+class _FakeLLM:
+    model_name = "fake-model"
+
+    async def ainvoke(self, messages, **kwargs):
+        return Mock(content=f"응답 {len(messages[-1]['content'])}")
+
+
+class TestTaskPromptCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        prompt_generator._task_prompt_cache.clear()
+        prompt_generator.clear_mem0_search_cache()
+
+    async def _generate_twice(self, mem0_run):
+        mem0_tool = Mock(_run=Mock(side_effect=mem0_run))
+        agents = [{"id": "agent-1", "tenant_id": "tenant-1", "role": "회계"}]
+        generator = prompt_generator.DynamicPromptGenerator(_FakeLLM())
+        with patch.object(prompt_generator.DynamicPromptGenerator, "_get_mem0_tool", return_value=mem0_tool), \
+                patch.object(prompt_generator.DynamicPromptGenerator, "_collect_dmn_analysis", return_value=({}, False)):
+            for _ in range(2):
+                await generator.generate_task_prompt("출장비 정산", agents)
+        return mem0_tool._run.call_count
+
+    async def test_successful_lookup_result_is_cached(self):
+        self.assertEqual(await self._generate_twice(lambda query: "개인지식 1 (관련도: 0.9)\n한도 500만원"), 1)
+
+    async def test_failed_lookup_result_is_not_cached(self):
+        def _fail(query):
+            raise ConnectionError("vector store down")
+
+        self.assertEqual(await self._generate_twice(_fail), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import tool_loader
+
+
+class TestIsUnrecoverable(unittest.TestCase):
+    def test_follows_cause_chain(self):
+        try:
+            try:
+                raise FileNotFoundError("npx")
+            except FileNotFoundError as e:
+                raise RuntimeError("adapter start failed") from e
+        except RuntimeError as e:
+            self.assertTrue(tool_loader._is_unrecoverable(e))
+
+    def test_ignores_implicit_context(self):
+        try:
+            try:
+                {}["missing"]
+            except KeyError:
+                raise ConnectionError("server not ready")
+        except ConnectionError as e:
+            self.assertFalse(tool_loader._is_unrecoverable(e))
+
+    def test_exception_group_requires_all_unrecoverable(self):
+        config_error = tool_loader.MCPConfigError("bad env")
+        self.assertTrue(tool_loader._is_unrecoverable(ExceptionGroup("g", [config_error, PermissionError()])))
+        self.assertFalse(tool_loader._is_unrecoverable(ExceptionGroup("g", [config_error, ConnectionError()])))
+
+    def test_type_error_is_retried(self):
+        self.assertFalse(tool_loader._is_unrecoverable(TypeError("adapter bug")))
+
+
+class TestBackoffDelay(unittest.TestCase):
+    def test_delay_within_jitter_bounds(self):
+        for attempt in (1, 2, 3, 10):
+            cap = min(tool_loader.MCP_RETRY_MAX_DELAY, tool_loader.MCP_RETRY_BASE_DELAY * (2 ** attempt))
+            for _ in range(50):
+                self.assertTrue(0 <= tool_loader._backoff_delay(attempt) <= cap)
+
+
+class TestTaggedSafeToolLoader(unittest.TestCase):
+    def setUp(self):
+        self.loader = tool_loader.TaggedSafeToolLoader(
+            tenant_id="tenant-1",
+            mcp_config={"mcpServers": {"Supabase": {"url": "http://localhost:9000/sse"}}},
+        )
+        self.loader.local_tools = ["mem0"]
+
+    def test_filter_tool_names(self):
+        names = ["Supabase", "supabase ", "a2a:Agent", "unknown", "mem0", "", None]
+        self.assertEqual(self.loader._filter_tool_names(names), ["Supabase", "a2a:Agent", "mem0"])
+
+    def test_retry_or_raise_does_not_retry_config_error(self):
+        error = tool_loader.MCPConfigError("args 는 배열이어야 합니다")
+        with self.assertRaises(tool_loader.MCPConfigError):
+            self.loader._retry_or_raise("supabase", 1, error)
+
+    def test_retry_or_raise_returns_delay_for_transient_error(self):
+        delay = self.loader._retry_or_raise("supabase", 1, ConnectionError("refused"))
+        self.assertTrue(0 <= delay <= tool_loader.MCP_RETRY_BASE_DELAY * 2)
+        with self.assertRaises(ConnectionError):
+            self.loader._retry_or_raise("supabase", tool_loader.MCP_MAX_RETRIES, ConnectionError("refused"))
+
+
+class TestAcreateToolsFromNames(unittest.IsolatedAsyncioTestCase):
+    async def test_preloaded_exception_is_raised_and_cleared(self):
+        loader = tool_loader.TaggedSafeToolLoader(
+            tenant_id="tenant-1",
+            mcp_config={"mcpServers": {"supabase": {"url": "http://localhost:9000/sse"}}},
+        )
+        loader.local_tools = []
+        errors = []
+
+        def _create_tools(self, tool_names, agent_type=None, a2a_endpoints=None):
+            for name in tool_names:
+                try:
+                    self._load_mcp_tool(name)
+                except Exception as e:
+                    errors.append(e)
+            return []
+
+        with patch.object(loader, "_aconnect_mcp_server", AsyncMock(side_effect=ConnectionError("refused"))), \
+                patch.object(tool_loader.SafeToolLoader, "create_tools_from_names", _create_tools):
+            await loader.acreate_tools_from_names(["supabase"])
+
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], ConnectionError)
+        self.assertEqual(loader._preloaded, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
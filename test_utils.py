@@ -0,0 +1,182 @@
+import json
+import time
+import unittest
+
+import utils
+
+
+class TestParseJsonGuard(unittest.TestCase):
+    def test_plain_json(self):
+        self.assertEqual(utils._parse_json_guard('{"a": 1}'), {"a": 1})
+
+    def test_json_wrapped_in_prose(self):
+        text = '결과는 다음과 같습니다.\n{"상태": "SUCCESS", "폼_데이터": {"k": "v"}}\n감사합니다.'
+        self.assertEqual(
+            utils._parse_json_guard(text),
+            {"상태": "SUCCESS", "폼_데이터": {"k": "v"}},
+        )
+
+    def test_code_fenced_json(self):
+        text = '```json\n{"폼_데이터": {"k": "v"}}\n```'
+        self.assertEqual(utils._parse_json_guard(text), {"폼_데이터": {"k": "v"}})
+
+    def test_code_fenced_json_with_prose(self):
+        text = '결과입니다.\n```json\n{"폼_데이터": {"k": "`v`"}}\n```\n끝.'
+        self.assertEqual(utils._parse_json_guard(text), {"폼_데이터": {"k": "`v`"}})
+
+    def test_two_code_fenced_objects_are_merged(self):
+        text = '```json\n{"폼_데이터": {"k": "v"}}\n```\n\n```json\n{"budget_report": "# 제목"}\n```'
+        self.assertEqual(
+            utils._parse_json_guard(text),
+            {"폼_데이터": {"k": "v"}, "budget_report": "# 제목"},
+        )
+
+    def test_multiple_objects_are_merged(self):
+        text = '{"폼_데이터": {"k": "v"}}\n{"budget_report": "# 제목"}'
+        self.assertEqual(
+            utils._parse_json_guard(text),
+            {"폼_데이터": {"k": "v"}, "budget_report": "# 제목"},
+        )
+
+    def test_objects_separated_by_prose_are_merged(self):
+        text = '폼 결과:\n{"폼_데이터": {"k": "v"}}\n리포트:\n{"budget_report": "# 제목 {초안}"}'
+        self.assertEqual(
+            utils._parse_json_guard(text),
+            {"폼_데이터": {"k": "v"}, "budget_report": "# 제목 {초안}"},
+        )
+
+    def test_broken_first_object_keeps_later_objects(self):
+        text = '{"폼_데이터": {"k": "v",, }\n{"budget_report": "# 제목"}'
+        self.assertEqual(utils._parse_json_guard(text), {"budget_report": "# 제목"})
+
+    def test_broken_middle_object_keeps_later_objects(self):
+        text = '{"a": 1}\n{"b": broken}\n{"c": 3}'
+        self.assertEqual(utils._parse_json_guard(text), {"a": 1, "c": 3})
+
+    def test_backtick_value_literal(self):
+        text = '{"budget_report": `# 제목\n내용`}'
+        self.assertEqual(utils._parse_json_guard(text), {"budget_report": "# 제목\n내용"})
+
+    def test_valid_json_with_inline_code_is_untouched(self):
+        text = '{"report": "설명: `code` 참고"}'
+        self.assertEqual(utils._parse_json_guard(text), {"report": "설명: `code` 참고"})
+
+    def test_tolerant_trailing_comma_and_single_quotes(self):
+        self.assertEqual(utils._parse_json_guard('{"a": [1, 2,], "b": "x",}'), {"a": [1, 2], "b": "x"})
+        self.assertEqual(utils._parse_json_guard("{'a': 'x'}"), {"a": "x"})
+
+    def test_tolerant_repair_keeps_string_contents(self):
+        self.assertEqual(utils._parse_json_guard('{"a": "x, ]", "b": 1,}'), {"a": "x, ]", "b": 1})
+        self.assertEqual(utils._parse_json_guard(r"{'a': 'don\'t'}"), {"a": "don't"})
+
+    def test_python_literal_fallback(self):
+        self.assertEqual(utils._parse_json_guard("{'a': True}"), {"a": True})
+
+    def test_large_integer_is_kept_exact(self):
+        self.assertEqual(
+            utils._parse_json_guard('{"account": 123456789012345678901234567890}'),
+            {"account": 123456789012345678901234567890},
+        )
+
+    def test_unparseable_raises(self):
+        with self.assertRaises(ValueError):
+            utils._parse_json_guard("not json at all")
+
+
+class TestDumpsJson(unittest.TestCase):
+    def test_round_trips_non_ascii(self):
+        text = utils.dumps_json({"폼": "값", "n": [1, 2]})
+        self.assertIn("값", text)
+        self.assertEqual(utils._parse_json_guard(text), {"폼": "값", "n": [1, 2]})
+
+    def test_indent_matches_stdlib(self):
+        value = {"폼": [1, 2.5, {"k": None, "b": True}], "빈": [], "s": 'a"b\n'}
+        self.assertEqual(utils.dumps_json(value, indent=True), json.dumps(value, ensure_ascii=False, indent=2))
+
+
+class TestBoundedLRU(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        evicted = []
+        cache = utils.BoundedLRU(2, on_evict=evicted.append)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(evicted, [2])
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+    def test_ttl_and_disabled_cache(self):
+        cache = utils.BoundedLRU(4, ttl=0.01)
+        cache.put("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        disabled = utils.BoundedLRU(0)
+        disabled.put("a", 1)
+        self.assertNotIn("a", disabled)
+
+    def test_get_or_create_keeps_first_value_and_skips_none(self):
+        cache = utils.BoundedLRU(4)
+        self.assertIsNone(cache.get_or_create("k", lambda: None))
+        self.assertNotIn("k", cache)
+        first = cache.get_or_create("k", object)
+        self.assertIs(cache.get_or_create("k", object), first)
+        self.assertIs(cache.setdefault("k", object()), first)
+
+    def test_discard_only_matching_value(self):
+        cache = utils.BoundedLRU(4)
+        value = object()
+        cache.put("k", value)
+        self.assertFalse(cache.discard("k", object()))
+        self.assertTrue(cache.discard("k", value))
+        self.assertEqual(cache.clear(), [])
+
+
+class TestToFormDict(unittest.TestCase):
+    def test_list_of_key_text_items(self):
+        form_data = [{"key": "a", "text": "1"}, {"key": "b"}, {"text": "no key"}, "skip", {"key": None, "text": "x"}]
+        self.assertEqual(utils._to_form_dict(form_data), {"a": "1", "b": None, None: "x"})
+
+    def test_str_and_other_types(self):
+        self.assertEqual(utils._to_form_dict("본문"), {"content": "본문"})
+        self.assertEqual(utils._to_form_dict(None), {})
+
+
+class TestConvertCrewOutput(unittest.TestCase):
+    def test_splits_report_fields(self):
+        form_types = [
+            {"key": "title", "type": "text"},
+            {"key": "budget_report", "type": "report"},
+        ]
+        raw = '{"상태": "SUCCESS", "폼_데이터": {"title": "T", "budget_report": "# R"}}'
+        pure, wrapped, original, reports, slides = utils.convert_crew_output(raw, "form1", form_types)
+        self.assertEqual(pure, {"title": "T"})
+        self.assertEqual(wrapped, {"form1": {"title": "T"}})
+        self.assertEqual(original, {"상태": "SUCCESS"})
+        self.assertEqual(reports, {"budget_report": "# R"})
+        self.assertEqual(slides, {})
+
+    def test_structured_result_skips_parsing(self):
+        class _Output:
+            raw = "not json"
+            json_dict = {"폼_데이터": {"title": "T"}}
+
+        pure, wrapped, _, _, _ = utils.convert_crew_output(_Output(), "form1")
+        self.assertEqual(pure, {"title": "T"})
+        self.assertEqual(wrapped, {"form1": {"title": "T"}})
+
+    def test_pydantic_result_skips_parsing(self):
+        class _Model:
+            def model_dump(self):
+                return {"폼_데이터": {"title": "P"}}
+
+        class _Output:
+            raw = "not json"
+            json_dict = None
+            pydantic = _Model()
+
+        pure, _, _, _, _ = utils.convert_crew_output(_Output(), "form1")
+        self.assertEqual(pure, {"title": "P"})
+
+
+if __name__ == "__main__":
+    unittest.main()
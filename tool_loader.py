@@ -0,0 +1,587 @@
+import os
+import copy
+import json
+import asyncio
+import atexit
+import time
+import random
+import logging
+import subprocess
+import threading
+import shutil
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
+from crewai_tools import MCPServerAdapter
+from processgpt_agent_utils.tools.safe_tool_loader import SafeToolLoader
+from utils import BoundedLRU
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# =============================
+# MCP 서버 연결 재시도 정책
+# - 고정 간격 대기 대신 지수 백오프 + full jitter 를 사용합니다.
+# - delay = uniform(0, min(MAX_DELAY, BASE_DELAY * 2**attempt))
+# - 여러 워커가 같은 서버에 동시에 실패해도 재시도 시점이 분산됩니다.
+# =============================
+MCP_MAX_RETRIES = 3
+MCP_RETRY_BASE_DELAY = 1.0
+MCP_RETRY_MAX_DELAY = 30.0
+
+
+class MCPConfigError(ValueError):
+    """MCP 서버 설정(mcpServers 항목) 형식 오류. 재시도해도 해결되지 않는다."""
+
+
+# 재시도해도 결과가 바뀌지 않는 오류 (실행 파일 없음, 권한 없음, 설정 형식 오류)
+_UNRECOVERABLE_ERRORS = (FileNotFoundError, PermissionError, NotADirectoryError, MCPConfigError)
+
+
+def _is_unrecoverable(exc: BaseException) -> bool:
+    """예외(명시적 원인 체인 __cause__, anyio ExceptionGroup 포함)가 재시도 불가 오류인지 판별.
+
+    __context__ 는 따라가지 않는다. 다른 예외를 처리하던 중 우연히 발생한 일시적 오류까지
+    재시도 불가로 분류되면 안 되기 때문이다.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, _UNRECOVERABLE_ERRORS):
+            return True
+        if isinstance(exc, BaseExceptionGroup):
+            return all(_is_unrecoverable(sub) for sub in exc.exceptions)
+        exc = exc.__cause__
+    return False
+
+
+def _backoff_delay(attempt: int) -> float:
+    """attempt(1부터 시작)에 대한 full jitter 대기 시간(초)."""
+    return random.uniform(0, min(MCP_RETRY_MAX_DELAY, MCP_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+# =============================
+# MCP 어댑터 풀
+# - MCPServerAdapter 생성은 stdio 서브프로세스 기동 + MCP 핸드셰이크를 수반합니다.
+# - 같은 실행 파라미터(명령/인자/env 또는 url/headers)면 프로세스 전역에서 재사용합니다.
+# - 풀에 들어간 어댑터는 SafeToolLoader.adapters 에 등록하지 않습니다.
+#   (작업마다 호출되는 shutdown_all_adapters 에서 종료되지 않도록)
+# - 꺼내 쓸 때 MCPAdapt 스레드/루프가 죽었으면(서브프로세스 종료) 풀에서 내리고 새로 연결합니다.
+# - 호출자마다 Tool 사본을 넘기며, 사본 실행이 실패하면 해당 어댑터를 풀에서 내립니다.
+# - 기본값은 0(비활성, 기존처럼 작업 단위로 종료)이며, 양수로 지정해야 풀을 사용합니다.
+# =============================
+MCP_ADAPTER_POOL_SIZE = int(os.getenv("MCP_ADAPTER_POOL_SIZE", "0"))
+
+def _stop_adapter(adapter: MCPServerAdapter) -> None:
+    try:
+        adapter.stop()
+    except Exception as e:
+        logger.warning("⚠️ MCP 어댑터 종료 실패 | err=%s", e)
+
+
+# 용량 초과로 밀려난 어댑터는 종료
+_adapter_pool = BoundedLRU(MCP_ADAPTER_POOL_SIZE, on_evict=_stop_adapter)
+
+
+def _adapter_key(params) -> tuple:
+    """서버 파라미터로 풀 키 생성 (env/headers 가 다르면 별도 어댑터)."""
+    if isinstance(params, dict):
+        headers = params.get("headers") or {}
+        return (params.get("transport"), params.get("url"), tuple(sorted(headers.items())))
+    env = getattr(params, "env", None) or {}
+    return ("stdio", params.command, tuple(params.args or ()), tuple(sorted(env.items())))
+
+
+def _adapter_alive(adapter: MCPServerAdapter) -> bool:
+    """MCPAdapt 백그라운드 스레드/이벤트 루프가 살아 있는지 (MCP 서브프로세스가 죽으면 스레드가 끝난다)."""
+    inner = getattr(adapter, "_adapter", None)
+    thread = getattr(inner, "thread", None)
+    if thread is not None and not thread.is_alive():
+        return False
+    loop = getattr(inner, "loop", None)
+    if loop is not None and loop.is_closed():
+        return False
+    return True
+
+
+def _get_pooled_adapter(key: tuple) -> Optional[MCPServerAdapter]:
+    """살아 있는 풀 어댑터를 반환. 세션이 끊긴 어댑터는 풀에서 내리고 종료한 뒤 None."""
+    adapter = _adapter_pool.get(key)
+    if adapter is None or _adapter_alive(adapter):
+        return adapter
+    if not _adapter_pool.discard(key, adapter):
+        return None
+    logger.warning("⚠️ 세션이 끊긴 MCP 어댑터를 풀에서 제거 | key=%s", key[:2])
+    _stop_adapter(adapter)
+    return None
+
+
+def _evict_pooled_adapter(key: tuple, adapter: MCPServerAdapter) -> None:
+    """Tool 실행 실패 시 어댑터를 풀에서 내린다 (그 사이 다른 어댑터로 바뀌었으면 무시).
+
+    세션이 아직 살아 있으면 다른 작업이 쓰고 있을 수 있으므로 작업 단위 종료 대상으로 넘기고,
+    이미 끊겼으면 바로 종료한다.
+    """
+    if not _adapter_pool.discard(key, adapter):
+        return
+    logger.warning("⚠️ Tool 실행 실패로 MCP 어댑터를 풀에서 제거 | key=%s", key[:2])
+    if _adapter_alive(adapter):
+        SafeToolLoader.adapters.append(adapter)
+    else:
+        _stop_adapter(adapter)
+
+
+def _pooled_tools(key: tuple, adapter: MCPServerAdapter) -> List:
+    """풀 어댑터의 Tool 을 호출자별 얕은 사본으로 반환.
+
+    같은 Tool 객체를 여러 crew 가 공유하면 서버 태깅(setattr)이 서로 덮어쓰므로 사본을 쓰고,
+    사본의 _run 이 예외를 내면 어댑터를 풀에서 내려 다음 작업은 새로 연결하도록 한다.
+    """
+    tools = []
+    for tool in adapter.tools:
+        tool_copy = copy.copy(tool)
+        run = getattr(tool_copy, "_run", None)
+        if callable(run):
+            def guarded_run(*args, _run=run, **kwargs):
+                try:
+                    return _run(*args, **kwargs)
+                except Exception:
+                    _evict_pooled_adapter(key, adapter)
+                    raise
+            try:
+                object.__setattr__(tool_copy, "_run", guarded_run)
+            except Exception:
+                # __dict__ 가 없는 Tool 구현은 감시 없이 사본만 넘깁니다.
+                pass
+        tools.append(tool_copy)
+    return tools
+
+
+def _pool_adapter(key: tuple, adapter: MCPServerAdapter) -> bool:
+    """어댑터를 풀에 등록. 풀이 꺼져 있거나 이미 같은 키가 있으면 False."""
+    if _adapter_pool.maxsize <= 0:
+        return False
+    return _adapter_pool.setdefault(key, adapter) is adapter
+
+
+def shutdown_pooled_adapters() -> None:
+    """풀에 보관된 MCP 어댑터를 모두 종료 (프로세스 종료 시 자동 호출)."""
+    for adapter in _adapter_pool.clear():
+        _stop_adapter(adapter)
+
+
+atexit.register(shutdown_pooled_adapters)
+
+
+_anyio_patch_lock = threading.Lock()
+_anyio_patched = False
+
+
+def _ensure_anyio_patch() -> None:
+    """anyio open_process stderr 패치를 프로세스당 한 번만 적용.
+
+    SafeToolLoader는 MCP 도구를 로드할 때마다 패치를 다시 씌우는데,
+    매번 클로저를 새로 만들고 전역 속성을 덮어써 병렬 로드 시 경합이 생긴다.
+    """
+    global _anyio_patched
+    if _anyio_patched:
+        return
+    with _anyio_patch_lock:
+        if _anyio_patched:
+            return
+        from anyio._core._subprocesses import open_process as _orig
+
+        async def patched_open_process(*args, **kwargs):
+            stderr = kwargs.get("stderr")
+            if not (hasattr(stderr, "fileno") and stderr.fileno()):
+                kwargs["stderr"] = subprocess.PIPE
+            return await _orig(*args, **kwargs)
+
+        anyio.open_process = patched_open_process
+        anyio._core._subprocesses.open_process = patched_open_process
+        _anyio_patched = True
+        logger.debug("✅ anyio stderr 패치 적용 완료")
+
+
+@lru_cache(maxsize=1)
+def _npm_global_root() -> str:
+    """`npm root -g` 결과 (프로세스당 한 번만 조회, 실패 시 빈 문자열)"""
+    npm = shutil.which("npm") or shutil.which("npm.cmd")
+    if not npm:
+        return ""
+    try:
+        out = subprocess.run(
+            [npm, "root", "-g"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=10,
+            text=True,
+            shell=(os.name == "nt"),
+        )
+        return out.stdout.strip() if out.returncode == 0 else ""
+    except Exception as e:
+        logger.debug("⚠️ npm 전역 경로 조회 실패 (무시) | err=%s", e)
+        return ""
+
+
+def _split_npm_spec(spec: str) -> Tuple[str, str]:
+    """'@scope/name@1.2.3' -> ('@scope/name', '1.2.3'), 'name' -> ('name', '')"""
+    at = spec.rfind("@")
+    if at > 0:
+        return spec[:at], spec[at + 1:]
+    return spec, ""
+
+
+@lru_cache(maxsize=64)
+def _resolve_package_bin(spec: str) -> Optional[str]:
+    """npx 없이 바로 실행할 수 있는 패키지 실행 파일 경로.
+
+    로컬 node_modules 또는 전역(npm -g)에 설치된 패키지만 대상이며,
+    버전이 명시된 경우 설치된 버전과 일치할 때만 사용한다. 찾지 못하면 None.
+    """
+    name, version = _split_npm_spec(spec)
+    local_root = os.path.join(os.getcwd(), "node_modules")
+    for root in (local_root, _npm_global_root()):
+        if not root:
+            continue
+        try:
+            with open(os.path.join(root, name, "package.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if version and version != "latest" and manifest.get("version") != version:
+            continue
+
+        # bin 필드: 문자열이면 패키지명 basename, dict면 단일 항목 또는 basename과 같은 항목 (npx 규칙)
+        basename = name.rsplit("/", 1)[-1]
+        bin_field = manifest.get("bin")
+        if isinstance(bin_field, str):
+            bin_name = basename
+        elif isinstance(bin_field, dict) and len(bin_field) == 1:
+            bin_name = next(iter(bin_field))
+        elif isinstance(bin_field, dict) and basename in bin_field:
+            bin_name = basename
+        else:
+            continue
+
+        if root == local_root:
+            path = shutil.which(bin_name, path=os.path.join(local_root, ".bin"))
+        else:
+            path = shutil.which(bin_name)
+        if path:
+            return path
+    return None
+
+
+_warmed_npx_packages: set = set()  # 이 프로세스에서 이미 워밍업했거나 npx 캐시에 있는 패키지 spec
+
+
+def _npx_cache_has(spec: str) -> bool:
+    """npx 캐시(<npm cache>/_npx/*/node_modules/<pkg>)에 패키지가 이미 내려받아져 있는지."""
+    name, _ = _split_npm_spec(spec)
+    cache_root = os.getenv("npm_config_cache") or (
+        os.path.join(os.getenv("LOCALAPPDATA", ""), "npm-cache") if os.name == "nt" else os.path.expanduser("~/.npm")
+    )
+    npx_root = os.path.join(cache_root, "_npx")
+    try:
+        entries = os.listdir(npx_root)
+    except OSError:
+        return False
+    return any(
+        os.path.isfile(os.path.join(npx_root, entry, "node_modules", name, "package.json"))
+        for entry in entries
+    )
+
+
+def _direct_npx_command(server_cfg: dict) -> Optional[Tuple[str, List[str]]]:
+    """`npx -y <pkg> ...` 설정이면 (설치된 실행 파일, 나머지 인자)를 반환"""
+    if server_cfg.get("command") != "npx":
+        return None
+    args = [str(a) for a in server_cfg.get("args") or []]
+    if not (len(args) > 1 and args[0] == "-y"):
+        return None
+    path = _resolve_package_bin(args[1])
+    if not path:
+        return None
+    return path, args[2:]
+
+
+def _infer_transport(server_cfg: dict) -> str:
+    """transport 우선순위: transport > type > url 스킴 추론 > 기본값(stdio)"""
+    transport = server_cfg.get("transport") or server_cfg.get("type")
+    if not transport:
+        url = server_cfg.get("url", "")
+        if isinstance(url, str) and url:
+            if url.startswith(("ws://", "wss://")):
+                transport = "websocket"
+            elif url.startswith(("http://", "https://")):
+                transport = "streamable-http"
+    return str(transport or "stdio").lower()
+
+
+class TaggedSafeToolLoader(SafeToolLoader):
+    """MCP 서버 출처를 Tool 객체에 태깅하는 SafeToolLoader 래퍼.
+
+    crewai_tools.MCPServerAdapter가 반환하는 Tool 객체는 기본적으로 '어느 MCP 서버에서 왔는지' 정보가 없어서
+    우선순위 정렬을 위해 서버 키를 attribute로 주입합니다.
+    MCP 서버 연결 재시도는 지수 백오프 + full jitter 정책을 따릅니다.
+    """
+
+    def __init__(self, tenant_id: str = None, user_id: str = None, agent_name: str = None, mcp_config: dict = None):
+        super().__init__(tenant_id=tenant_id, user_id=user_id, agent_name=agent_name, mcp_config=mcp_config)
+        _ensure_anyio_patch()
+        # mcpServers를 한 번만 파싱해 소문자 키로 색인 (도구별 warmup/load 마다 재탐색하지 않음)
+        self._mcp_servers = self._index_mcp_servers(self.mcp_config)
+        # 서버 프로세스에 넘길 환경변수 스냅샷 (도구 로드/재시도마다 os.environ 복사하지 않음)
+        self._env_snapshot = dict(os.environ)
+        # acreate_tools_from_names 가 미리 연결해 둔 MCP 서버 결과 (Tool 목록 또는 예외)
+        self._preloaded: Dict[str, Any] = {}
+
+    @staticmethod
+    def _index_mcp_servers(mcp_config: dict) -> Dict[str, dict]:
+        servers = (mcp_config or {}).get("mcpServers") or {}
+        if not isinstance(servers, dict):
+            return {}
+        return {
+            str(key).strip().lower(): cfg
+            for key, cfg in servers.items()
+            if isinstance(cfg, dict) and cfg
+        }
+
+    def _apply_anyio_patch(self):
+        """프로세스 단위로 한 번만 적용된 패치를 재사용 (SafeToolLoader 호환용)"""
+        _ensure_anyio_patch()
+
+    def _get_mcp_config(self, tool_name: str) -> dict:
+        """색인된 MCP 설정에서 특정 도구 설정 반환 (설정 없으면 빈 dict)"""
+        cfg = self._mcp_servers.get(str(tool_name).strip().lower())
+        if not cfg:
+            logger.debug("⚠️ MCP 설정 없음 | tool_name=%s available_servers=%s", tool_name, list(self._mcp_servers))
+            return {}
+        return cfg
+
+    def warmup_server(self, server_key: str):
+        """npx 기반 서버의 패키지를 미리 캐시에 저장.
+
+        POSIX에서는 셸 없이 직접 실행하고(list 인자 + shell=True는 'npx'만 실행됨),
+        사용하지 않는 stdout/stderr는 메모리에 쌓지 않고 버린다.
+        대부분의 stdio MCP 서버는 --help 를 무시하고 stdin 을 읽으므로 stdin 은 닫아 바로 종료시키고,
+        이미 npx 캐시에 있거나 이 프로세스에서 한 번 워밍업한 패키지는 다시 실행하지 않는다.
+        """
+        if str(server_key).strip().lower() in self._preloaded:
+            return
+        cfg = self._get_mcp_config(server_key)
+        if not cfg or cfg.get("command") != "npx":
+            logger.debug("⏭️ 서버 워밍업 생략: npx 명령어 아님 | server_key=%s", server_key)
+            return
+
+        args = cfg.get("args") or []
+        if not (len(args) > 1 and args[0] == "-y"):
+            logger.debug("⏭️ 서버 워밍업 생략: -y 플래그 없음 | server_key=%s", server_key)
+            return
+
+        pkg = str(args[1])
+        direct = _direct_npx_command(cfg)
+        if direct:
+            logger.info("⏭️ 서버 워밍업 생략: 설치된 실행 파일 사용 | server_key=%s bin=%s", server_key, direct[0])
+            return
+
+        if pkg in _warmed_npx_packages or _npx_cache_has(pkg):
+            _warmed_npx_packages.add(pkg)
+            logger.debug("⏭️ 서버 워밍업 생략: npx 캐시에 있음 | server_key=%s pkg=%s", server_key, pkg)
+            return
+
+        npx = self._find_npx_command()
+        for label, timeout in (("빠른", 10), ("느린", 60)):
+            try:
+                subprocess.run(
+                    [npx, "-y", pkg, "--help"],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=timeout,
+                    shell=(os.name == "nt"),
+                )
+                _warmed_npx_packages.add(pkg)
+                logger.info("✅ NPX 패키지 캐시 성공 (%s) | server_key=%s pkg=%s", label, server_key, pkg)
+                return
+            except subprocess.TimeoutExpired:
+                logger.debug("⏰ NPX 패키지 캐시 타임아웃 (%s) | server_key=%s pkg=%s", label, server_key, pkg)
+            except Exception as e:
+                logger.debug("⚠️ NPX 패키지 캐시 실패 (%s, 무시) | server_key=%s pkg=%s err=%s", label, server_key, pkg, e)
+
+    def _build_server_parameters(self, server_cfg: dict, env_vars: dict, timeout: int):
+        """npx 콜드 스타트 대신 설치된 패키지 실행 파일이 있으면 그것으로 서버를 띄운다."""
+        direct = _direct_npx_command(server_cfg)
+        if direct:
+            command, args = direct
+            logger.info("⚡ npx 대신 설치된 실행 파일 사용 | bin=%s", command)
+            server_cfg = {**server_cfg, "command": command, "args": args}
+        return super()._build_server_parameters(server_cfg=server_cfg, env_vars=env_vars, timeout=timeout)
+
+    def create_tools_from_names(self, tool_names: List[str], agent_type: Optional[str] = None, a2a_endpoints: Optional[Dict[str, Dict]] = None) -> List:
+        """중복 도구명을 제거하고 설정이 없는 MCP 도구를 미리 걸러낸 뒤 로드한다.
+
+        중복 이름은 warmup/MCP 연결을 중복 수행하고, 설정 없는 이름은 로드 단계까지 가서야 실패한다.
+        """
+        requested = self._filter_tool_names(tool_names)
+        return super().create_tools_from_names(requested, agent_type=agent_type, a2a_endpoints=a2a_endpoints)
+
+    def _filter_tool_names(self, tool_names: List[str]) -> List[str]:
+        if isinstance(tool_names, str):
+            tool_names = [tool_names]
+
+        # 소문자 키 기준 중복 제거 (순서 유지, A2A 이름 대소문자 보존을 위해 원본 문자열 유지)
+        unique: Dict[str, str] = {}
+        for name in tool_names or []:
+            if isinstance(name, str) and name.strip():
+                unique.setdefault(name.strip().lower(), name.strip())
+
+        requested = []
+        unknown = []
+        for key, name in unique.items():
+            if key in self.local_tools or key.startswith("a2a:") or key in self._mcp_servers:
+                requested.append(name)
+            else:
+                unknown.append(name)
+        if unknown:
+            logger.warning("⚠️ MCP 설정이 없는 도구 제외 | tools=%s", unknown)
+        return requested
+
+    async def acreate_tools_from_names(self, tool_names: List[str], agent_type: Optional[str] = None, a2a_endpoints: Optional[Dict[str, Dict]] = None) -> List:
+        """create_tools_from_names 의 비동기 버전.
+
+        필요한 MCP 서버(요청된 서버 + is_default 서버)를 동시에 연결해 두고,
+        나머지 조립은 스레드에서 기존 동기 경로로 수행한다. 재시도 대기는 asyncio.sleep 이라
+        한 서버의 백오프가 다른 서버 연결이나 이벤트 루프를 막지 않는다.
+        """
+        requested = self._filter_tool_names(tool_names)
+        keys = [name.lower() for name in requested if name.lower() in self._mcp_servers]
+        keys += [
+            key for key, cfg in self._mcp_servers.items()
+            if isinstance(cfg, dict) and cfg.get("is_default") is True and key not in keys
+        ]
+        keys = [key for key in keys if key not in self.local_tools and not key.startswith("a2a:")]
+
+        if keys:
+            results = await asyncio.gather(*(self._aconnect_mcp_server(key) for key in keys), return_exceptions=True)
+            self._preloaded.update(zip(keys, results))
+        try:
+            return await asyncio.to_thread(
+                super().create_tools_from_names, requested, agent_type=agent_type, a2a_endpoints=a2a_endpoints
+            )
+        finally:
+            self._preloaded.clear()
+
+    def _load_mcp_tool(self, tool_name: str) -> List:
+        preloaded = self._preloaded.pop(str(tool_name).strip().lower(), None)
+        if isinstance(preloaded, BaseException):
+            raise preloaded
+        tools = preloaded if preloaded is not None else self._connect_mcp_server(tool_name)
+        for t in tools or []:
+            try:
+                setattr(t, "_processgpt_mcp_server", tool_name)
+            except Exception:
+                # 일부 Tool 구현은 setattr이 막혀 있을 수 있어 무시합니다.
+                pass
+        return tools
+
+    def _prepare_connection(self, tool_name: str) -> Optional[Tuple[str, Any]]:
+        """재시도와 무관한 설정 조회/env 병합/서버 파라미터 구성을 한 번만 수행. 불가하면 None."""
+        server_cfg = self._get_mcp_config(tool_name)
+        if not server_cfg:
+            logger.warning("⚠️ MCP 도구 로드 생략: 설정 없음 | tool_name=%s", tool_name)
+            return None
+
+        server_env = server_cfg.get("env") or {}
+        if not isinstance(server_env, dict):
+            raise MCPConfigError(f"env 는 객체여야 합니다 | tool_name={tool_name}")
+        if not isinstance(server_cfg.get("args") or [], list):
+            raise MCPConfigError(f"args 는 배열이어야 합니다 | tool_name={tool_name}")
+
+        transport = _infer_transport(server_cfg)
+        params = self._build_server_parameters(
+            server_cfg=server_cfg,
+            env_vars={**self._env_snapshot, **server_env},
+            timeout=server_cfg.get("timeout", 40),
+        )
+        if params is None:
+            logger.warning("⚠️ MCP 서버 파라미터 구성 불가 → 스킵 | tool_name=%s transport=%s", tool_name, transport)
+            return None
+        return transport, params
+
+    @staticmethod
+    def _register_adapter(key: tuple, adapter: MCPServerAdapter) -> List:
+        """어댑터를 풀 또는 작업 단위 종료 대상에 등록하고 호출자에게 넘길 Tool 목록을 반환."""
+        if _pool_adapter(key, adapter):
+            return _pooled_tools(key, adapter)
+        # 풀에 넣지 못한 어댑터만 작업 단위 종료 대상에 등록
+        SafeToolLoader.adapters.append(adapter)
+        return adapter.tools
+
+    def _retry_or_raise(self, tool_name: str, attempt: int, e: Exception) -> float:
+        """실패 처리: 재시도 불가/최종 실패면 예외를 다시 던지고, 아니면 대기 시간(초)을 반환."""
+        if _is_unrecoverable(e):
+            logger.error("❌ MCP 서버 연결 불가 (재시도 생략) | tool_name=%s err=%s", tool_name, e)
+            raise e
+        logger.warning("⚠️ MCP 서버 연결 실패 (시도 %d/%d) | tool_name=%s err=%s", attempt, MCP_MAX_RETRIES, tool_name, e)
+        if attempt >= MCP_MAX_RETRIES:
+            logger.error("❌ MCP 서버 최종 연결 실패 | tool_name=%s 모든 재시도 소진", tool_name)
+            raise e
+        delay = _backoff_delay(attempt)
+        logger.info("⏳ MCP 서버 재시도 대기 | tool_name=%s delay=%.2fs", tool_name, delay)
+        return delay
+
+    def _connect_mcp_server(self, tool_name: str) -> List:
+        """MCP 서버에 연결해 Tool 목록을 반환 (지수 백오프 재시도)."""
+        logger.info("🔧 MCP 도구 로드 시작 | tool_name=%s", tool_name)
+
+        prepared = self._prepare_connection(tool_name)
+        if prepared is None:
+            return []
+        transport, params = prepared
+
+        key = _adapter_key(params)
+        pooled = _get_pooled_adapter(key)
+        if pooled is not None:
+            logger.info("♻️ MCP 어댑터 재사용 | tool_name=%s tools_count=%d", tool_name, len(pooled.tools))
+            return _pooled_tools(key, pooled)
+
+        for attempt in range(1, MCP_MAX_RETRIES + 1):
+            try:
+                logger.info("🚀 MCP 서버 시작 시도 %d/%d | tool_name=%s transport=%s", attempt, MCP_MAX_RETRIES, tool_name, transport)
+                adapter = MCPServerAdapter(params)
+                tools = self._register_adapter(key, adapter)
+                logger.info("✅ MCP 서버 연결 성공 | tool_name=%s tools_count=%d", tool_name, len(tools))
+                return tools
+            except Exception as e:
+                time.sleep(self._retry_or_raise(tool_name, attempt, e))
+        return []
+
+    async def _aconnect_mcp_server(self, tool_name: str) -> List:
+        """_connect_mcp_server 의 비동기 버전 (서버 기동은 스레드, 재시도 대기는 asyncio.sleep)."""
+        logger.info("🔧 MCP 도구 로드 시작 (async) | tool_name=%s", tool_name)
+
+        prepared = self._prepare_connection(tool_name)
+        if prepared is None:
+            return []
+        transport, params = prepared
+
+        key = _adapter_key(params)
+        pooled = _get_pooled_adapter(key)
+        if pooled is not None:
+            logger.info("♻️ MCP 어댑터 재사용 | tool_name=%s tools_count=%d", tool_name, len(pooled.tools))
+            return _pooled_tools(key, pooled)
+
+        await asyncio.to_thread(self.warmup_server, tool_name)
+        for attempt in range(1, MCP_MAX_RETRIES + 1):
+            try:
+                logger.info("🚀 MCP 서버 시작 시도 %d/%d | tool_name=%s transport=%s", attempt, MCP_MAX_RETRIES, tool_name, transport)
+                adapter = await asyncio.to_thread(MCPServerAdapter, params)
+                tools = self._register_adapter(key, adapter)
+                logger.info("✅ MCP 서버 연결 성공 | tool_name=%s tools_count=%d", tool_name, len(tools))
+                return tools
+            except Exception as e:
+                await asyncio.sleep(self._retry_or_raise(tool_name, attempt, e))
+        return []
@@ -1,12 +1,140 @@
 import re
 import json
 import ast
+import time
 import logging
-from typing import Any, Dict, Tuple
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
-_RE_CODE_BLOCK = re.compile(r"```(?:json)?\s*(.+?)\s*```", re.DOTALL)
+
+try:
+    import orjson
+    _RE_LONG_DIGITS = re.compile(r"\d{19,}")  # 64비트 범위를 넘을 수 있는 정수 후보
+
+    def _loads(text: str) -> Any:
+        """orjson.loads (str 입력 그대로 받음, json.loads 보다 2~3배 빠름).
+        orjson 은 64비트를 넘는 정수를 float 로 바꿔 긴 ID/계좌번호 등이 조용히 훼손되므로,
+        19자리 이상 숫자열이 있으면 정수를 정확히 유지하는 표준 json.loads 를 쓴다.
+        """
+        if _RE_LONG_DIGITS.search(text):
+            return json.loads(text)
+        return orjson.loads(text)
+
+    def _dumps(value: Any, indent: bool = False) -> str:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2 if indent else orjson.OPT_NON_STR_KEYS
+        try:
+            return orjson.dumps(value, option=option).decode()
+        except TypeError:  # orjson이 못 다루는 값(64비트 초과 정수 등)은 표준 json으로
+            return json.dumps(value, ensure_ascii=False, indent=2 if indent else None)
+except ImportError:  # pragma: no cover - orjson 미설치 환경
+    _loads = json.loads
+
+    def _dumps(value: Any, indent: bool = False) -> str:
+        return json.dumps(value, ensure_ascii=False, indent=2 if indent else None)
 _RE_BACKTICK_VALUE = re.compile(r'(:\s*)`([\s\S]*?)`')  # JSON value 자리에 백틱으로 감싼 리터럴
+_JSON_DECODER = json.JSONDecoder()  # raw_decode 재사용 (C 스캐너)
+_RE_JSON_OBJECT_BOUNDARY = re.compile(r'\}\s*\n\s*\{')  # "}\n{" 형태의 객체 경계
+# 폼 필드 type → 분리 대상 (리포트/슬라이드)
+_FIELD_TYPE_BUCKET = {"report": "report", "document": "report", "slide": "slide", "presentation": "slide"}
+# {"a": 1,} / [1, 2,] 형태의 후행 쉼표 (큰따옴표 문자열은 그룹 1로 통째로 건너뜀)
+_RE_TRAILING_COMMA = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[}\]])')
+
+_MISSING = object()
+
+
+class BoundedLRU:
+    """스레드 안전한 크기 제한 LRU 캐시 (선택적 TTL).
+
+    maxsize <= 0 이면 아무것도 저장하지 않는다. ttl > 0 이면 저장 후 ttl 초가 지난 항목은 없는 것으로 본다.
+    on_evict 는 용량 초과로 밀려난 값마다 락 밖에서 호출된다 (어댑터 종료 등).
+    """
+
+    def __init__(self, maxsize: int, ttl: float = 0.0, on_evict: Optional[Callable[[Any], None]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()  # key -> (저장 시각, 값)
+        self._lock = threading.Lock()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl > 0 and time.monotonic() - stored_at > self.ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if self._expired(entry[0]):
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._store(key, value, replace=True)
+
+    def setdefault(self, key: Hashable, value: Any) -> Any:
+        """key 가 없을 때만 저장하고 캐시에 남은 값(먼저 들어간 값)을 반환."""
+        return self._store(key, value, replace=False)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """없으면 factory() 로 만들어 저장. 생성은 느릴 수 있어 락 밖에서 수행하고
+        (동시에 같은 키를 만들면 먼저 들어간 값을 사용), None 은 저장하지 않는다.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = factory()
+        if value is None:
+            return None
+        return self.setdefault(key, value)
+
+    def discard(self, key: Hashable, value: Any = _MISSING) -> bool:
+        """key 를 제거 (value 를 주면 현재 값이 그 객체일 때만). 제거했으면 True."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (value is not _MISSING and entry[1] is not value):
+                return False
+            del self._data[key]
+            return True
+
+    def clear(self) -> List[Any]:
+        """모두 비우고 들어 있던 값 목록을 반환."""
+        with self._lock:
+            values = [value for _, value in self._data.values()]
+            self._data.clear()
+        return values
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _store(self, key: Hashable, value: Any, replace: bool) -> Any:
+        if self.maxsize <= 0:
+            return value
+        evicted = []
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and not replace and not self._expired(entry[0]):
+                value = entry[1]
+            else:
+                self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[1][1])
+        if self._on_evict is not None:
+            for old in evicted:
+                self._on_evict(old)
+        return value
+
+
+def dumps_json(value: Any, indent: bool = False) -> str:
+    """json.dumps(value, ensure_ascii=False[, indent=2]) 와 같은 UTF-8 JSON 문자열 (orjson 설치 시 orjson 사용)."""
+    return _dumps(value, indent)
 
 def _repair_backtick_value_literals(text: str) -> str:
     """
@@ -14,65 +142,138 @@ def _repair_backtick_value_literals(text: str) -> str:
     정상적인 JSON 문자열 값("...")으로 변환한다(개행/따옴표 등 안전 이스케이프).
     예: "newsletter_report": `# 제목\n내용`  ->  "newsletter_report": "# 제목\\n내용"
     """
+    if "`" not in text:
+        # 대부분의 정상 응답에는 백틱이 없으므로 정규식 치환을 건너뛴다
+        return text
+
     def _repl(m: re.Match) -> str:
         prefix = m.group(1)      # ":\s*"
         raw = m.group(2)         # 백틱 내부 원문
-        escaped = json.dumps(raw) # JSON-safe string (따옴표/개행 이스케이프)
+        escaped = _dumps(raw)    # JSON-safe string (따옴표/개행 이스케이프)
         return f"{prefix}{escaped}"
     return _RE_BACKTICK_VALUE.sub(_repl, text)
 
 def _parse_multiple_json_objects(text: str) -> Dict[str, Any]:
-    """여러 JSON 객체가 줄바꿈으로 연결된 문자열을 파싱하여 병합."""
+    """여러 JSON 객체가 줄바꿈으로 연결된 문자열을 파싱하여 병합.
+    "}\n{" 경계 뒤의 '{' 위치마다 raw_decode 로 바로 디코딩한다(분할/괄호 덧붙이기 없음).
+    깨진 객체는 건너뛰고 나머지 객체만 병합한다.
+    """
     merged = {}
-    text = text.strip()
-    
-    # "}\n{" 또는 "}\r\n{" 패턴으로 분리
-    import re
-    # JSON 객체 경계 찾기: } 다음에 줄바꿈, 그 다음 {
-    pattern = r'\}\s*\n\s*\{'
-    parts = re.split(pattern, text)
-    
-    for i, part in enumerate(parts):
-        part = part.strip()
-        
-        # 첫 번째가 아니면 앞에 { 추가
-        if i > 0:
-            part = '{' + part
-        # 마지막이 아니면 뒤에 } 추가
-        if i < len(parts) - 1:
-            part = part + '}'
-        
-        # JSON 파싱 시도
+    starts = [text.find("{")] + [m.end() - 1 for m in _RE_JSON_OBJECT_BOUNDARY.finditer(text)]
+    consumed = 0
+    for start in starts:
+        if start < consumed:
+            # 앞 객체 안쪽이거나 '{' 가 없는 경우
+            continue
         try:
-            obj = json.loads(part)
-            if isinstance(obj, dict):
-                merged.update(obj)
-        except Exception as e:
+            obj, consumed = _JSON_DECODER.raw_decode(text, start)
+        except ValueError as e:
             # 파싱 실패 시 무시하고 계속
-            logger.warning(f"⚠️ JSON 객체 파싱 실패 (무시): {str(e)[:100]}")
+            logger.warning("⚠️ JSON 객체 파싱 실패 (무시): %s", str(e)[:100])
             continue
-    
+        if isinstance(obj, dict):
+            merged.update(obj)
     return merged
 
+def _decode_json_objects(text: str) -> Tuple[list, Optional[int]]:
+    """문자열을 앞에서부터 한 번 훑으며 최상위 JSON 객체들을 순서대로 디코딩.
+    JSONDecoder.raw_decode(C 스캐너)가 객체 끝 위치를 돌려주므로 분할 정규식/재파싱 없이
+    설명문, 코드펜스, 줄바꿈으로 이어진 여러 객체를 한 번에 처리한다.
+    디코딩이 안 되는 위치를 만나면 그때까지 얻은 객체와 실패 위치(JSONDecodeError.pos)를 반환한다.
+    """
+    objects = []
+    idx = text.find("{")
+    while idx >= 0:
+        try:
+            obj, end = _JSON_DECODER.raw_decode(text, idx)
+        except json.JSONDecodeError as e:
+            return objects, e.pos
+        objects.append(obj)
+        idx = text.find("{", end)
+    return objects, None
+
+def _fenced_body(text: str) -> Optional[str]:
+    """첫 번째 ``` 코드펜스 안쪽 본문을 정규식 없이 잘라낸다.
+    펜스가 없거나, 닫는 펜스 뒤에 공백/남은 펜스 말고 다른 내용(두 번째 코드블록, 설명문 등)이 있으면 None.
+    (폼 JSON 뒤에 리포트 객체를 별도 블록으로 내는 응답이 첫 블록만으로 끝나지 않도록 전체 스캔에 맡긴다)
+    """
+    _, sep, rest = text.partition("```")
+    if not sep:
+        return None
+    if rest.startswith("json"):
+        rest = rest[4:]
+    body, sep, tail = rest.partition("```")
+    if not sep or tail.replace("`", "").strip():
+        return None
+    return body.strip()
+
+def _loads_tolerant(text: str) -> Any:
+    """LLM이 흔히 내는 '거의 JSON'(후행 쉼표, 작은따옴표만 사용)을 가볍게 고쳐 JSON으로 파싱.
+    ast.literal_eval 의 AST 컴파일 비용을 피하기 위한 단계로, 실패하면 예외를 그대로 던진다.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("JSON 객체 범위를 찾을 수 없음")
+    candidate = text[start:end + 1]
+    if '"' not in candidate and "\\" not in candidate:
+        # 큰따옴표/이스케이프가 없으면 모든 작은따옴표가 문자열 경계이므로 그대로 치환해도 안전
+        # ('don\'t' 처럼 이스케이프가 있으면 ast.literal_eval 단계에 맡긴다)
+        candidate = candidate.replace("'", '"')
+    candidate = _RE_TRAILING_COMMA.sub(lambda m: m.group(1) or m.group(2), candidate)
+    return _loads(candidate)
+
 def _parse_json_guard(text: str) -> Any:
     """문자열을 JSON으로 파싱. 여러 JSON 객체가 연결된 경우도 처리."""
-    repaired = _repair_backtick_value_literals(text)
-
-    # 1) 우선 JSON으로 시도
+    # 1) 원문 그대로 JSON 시도 (정상 응답은 정규식 스캔 없이 끝남)
+    #    마크다운 문자열 안의 "설명: `코드`" 가 백틱 수리로 깨지는 것도 방지
     try:
-        return json.loads(repaired)
+        return _loads(text)
     except Exception:
         pass
 
-    # 2) 여러 JSON 객체가 줄바꿈으로 연결된 경우 처리
-    # "}\n{" 패턴이 있으면 여러 JSON 객체로 간주
-    if '}\n{' in repaired or '}\r\n{' in repaired:
+    # 2) ```json ... ``` 로 감싼 흔한 형태는 문자열 분할만으로 처리 (백틱 수리 정규식 생략)
+    body = _fenced_body(text)
+    if body:
+        try:
+            return _loads(body)
+        except Exception:
+            pass
+
+    repaired = _repair_backtick_value_literals(text)
+    if repaired is not text:
+        try:
+            return _loads(repaired)
+        except Exception:
+            pass
+
+    # 3) 설명문/코드펜스/여러 객체: 최상위 객체들을 한 번의 스캔으로 디코딩 (여러 개면 병합)
+    objects, error_pos = _decode_json_objects(repaired)
+    if len(objects) == 1 and error_pos is None:
+        return objects[0]
+    merged = {}
+    for obj in objects:
+        if isinstance(obj, dict):
+            merged.update(obj)
+
+    # 4) (콜드 경로) 중간에 깨진 객체가 있는 경우: "}\n{" 경계로 나눠 그 뒤의 살릴 수 있는 객체까지 병합
+    #    경계는 실패 위치 뒤에만 의미가 있으므로 그 지점부터만 탐색한다
+    if error_pos is not None and _RE_JSON_OBJECT_BOUNDARY.search(repaired, error_pos) is not None:
         try:
-            return _parse_multiple_json_objects(repaired)
+            merged.update(_parse_multiple_json_objects(repaired))
         except Exception:
             pass
+    if merged or len(objects) > 1:
+        return merged
+    if objects:
+        return objects[0]
+
+    # 5) 후행 쉼표/작은따옴표 등 가벼운 수리 후 JSON 재시도
+    try:
+        return _loads_tolerant(repaired)
+    except Exception:
+        pass
 
-    # 3) JSON 실패 시, 파이썬 리터럴 파서로 보조 시도
+    # 6) JSON 실패 시, 파이썬 리터럴 파서로 보조 시도 (최후 수단)
     try:
         return ast.literal_eval(repaired)
     except Exception as e:
@@ -83,9 +284,9 @@ def _to_form_dict(form_data: Any) -> Dict[str, Any]:
     if isinstance(form_data, dict):
         return form_data
     if isinstance(form_data, list):
+        # 타입 검사는 원소당 한 번만, "key" 필드가 없는 항목만 제외 (key 값이 None 이어도 유지)
         return {
-            (item.get("key") if isinstance(item, dict) else None): 
-            (item.get("text") if isinstance(item, dict) else None)
+            item["key"]: item.get("text")
             for item in form_data
             if isinstance(item, dict) and "key" in item
         }
@@ -93,6 +294,32 @@ def _to_form_dict(form_data: Any) -> Dict[str, Any]:
         return {"content": form_data}
     return {}
 
+def log_preview(value: Any, limit: int = 200) -> str:
+    """로그용 미리보기: repr 을 한 번만 만들고 limit 자로 자른다."""
+    text = str(value)
+    return text[:limit] + "..." if len(text) > limit else text
+
+def _load_crew_result(result: Any) -> Any:
+    """CrewOutput/dict/문자열에서 파싱된 결과를 얻는다.
+    crewai 가 이미 구조화된 결과(json_dict 또는 dict raw)를 준 경우 문자열 파싱을 건너뛴다.
+    """
+    if isinstance(result, dict):
+        return result
+    json_dict = getattr(result, "json_dict", None)
+    if isinstance(json_dict, dict) and json_dict:
+        return json_dict
+    # output_pydantic 지정 시 crewai 가 채우는 모델 (CrewOutput 자체도 BaseModel 이므로 result.model_dump 는 쓰지 않음)
+    pydantic_out = getattr(result, "pydantic", None)
+    if pydantic_out is not None and hasattr(pydantic_out, "model_dump"):
+        return pydantic_out.model_dump()
+    raw = getattr(result, "raw", None)
+    if isinstance(raw, dict):
+        return raw
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="replace")
+    # raw 가 빈 문자열이어도 CrewOutput 전체를 str() 로 만들지 않는다
+    return _parse_json_guard(raw if isinstance(raw, str) else str(result))
+
 def convert_crew_output(result, form_id: str = None, form_types: Dict = None) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
     """
     CrewOutput/문자열 -> JSON 파싱 -> '폼_데이터'만 추출/정규화 -> form_id로 래핑
@@ -104,10 +331,9 @@ def convert_crew_output(result, form_id: str = None, form_types: Dict = None) ->
     """
     try:
         # 1) 문자열 확보
-        logger.info(f"\n\n🔍 결과 구조화를 위한 작업 진행 = form_id: {form_id}")
-        text = getattr(result, "raw", None) or str(result)
-        # 2~4) 견고 파싱(코드펜스/백틱-값 수리 포함)
-        output_val = _parse_json_guard(text)
+        logger.info("\n\n🔍 결과 구조화를 위한 작업 진행 = form_id: %s", form_id)
+        # 2~4) 견고 파싱(코드펜스/백틱-값 수리 포함), 이미 dict 면 파싱 생략
+        output_val = _load_crew_result(result)
 
         # 일부 모델/도구는 결과를 최상위가 아닌 'result' 키 아래에 감싸서 반환한다.
         # 이 경우 실제 유의미한 페이로드는 output_val['result'] 이므로 이를 기준으로 처리한다.
@@ -123,7 +349,7 @@ def convert_crew_output(result, form_id: str = None, form_types: Dict = None) ->
                     if not isinstance(result_data, dict):
                         result_data = {}
                 except Exception as e:
-                    logger.warning(f"⚠️ result 문자열 파싱 실패, 빈 dict 사용: {e}")
+                    logger.warning("⚠️ result 문자열 파싱 실패, 빈 dict 사용: %s", e)
                     result_data = {}
             elif isinstance(result_value, dict):
                 result_data = result_value
@@ -145,12 +371,17 @@ def convert_crew_output(result, form_id: str = None, form_types: Dict = None) ->
         else:
             result_data = output_val if isinstance(output_val, dict) else {}
 
-        # dict가 아니면 원본 구조로는 의미 없으니 dict로 강제 사용 불가 → 빈 사본
-        original_wo_form = dict(output_val) if isinstance(output_val, dict) else {}
+        # 원본에서 '폼_데이터'를 뺀 사본 (복사 후 pop 대신 한 번에 구성)
+        # dict가 아니면 원본 구조로는 의미 없으니 빈 dict
+        original_wo_form = (
+            {k: v for k, v in output_val.items() if k != "폼_데이터"}
+            if isinstance(output_val, dict) else {}
+        )
 
         # 리포트/슬라이드 필드 키 목록 추출 (form_types에서)
-        report_field_keys = []
-        slide_field_keys = []
+        # 멤버십 검사만 하므로 set 으로 보관 (키마다 리스트 선형 탐색 방지)
+        report_field_keys = set()
+        slide_field_keys = set()
         if form_types:
             form_fields = None
             if isinstance(form_types, dict) and ("fields" in form_types or "html" in form_types):
@@ -160,14 +391,18 @@ def convert_crew_output(result, form_id: str = None, form_types: Dict = None) ->
             
             if form_fields and isinstance(form_fields, list):
                 for field in form_fields:
-                    if isinstance(field, dict):
-                        field_type = field.get("type", "").lower()
-                        field_key = field.get("key", "")
-                        if field_key:
-                            if field_type in ["report", "document"]:
-                                report_field_keys.append(field_key)
-                            elif field_type in ["slide", "presentation"]:
-                                slide_field_keys.append(field_key)
+                    if not isinstance(field, dict):
+                        continue
+                    field_key = field.get("key")
+                    field_type = field.get("type")
+                    if not (field_key and isinstance(field_type, str)):
+                        continue
+                    # 대부분 이미 소문자이므로 lower() 는 첫 조회가 실패할 때만
+                    kind = _FIELD_TYPE_BUCKET.get(field_type) or _FIELD_TYPE_BUCKET.get(field_type.lower())
+                    if kind == "report":
+                        report_field_keys.add(field_key)
+                    elif kind == "slide":
+                        slide_field_keys.add(field_key)
 
         # 4) 폼_데이터 추출/정규화
         form_raw = output_val.get("폼_데이터") if isinstance(output_val, dict) else None
@@ -190,33 +425,30 @@ def convert_crew_output(result, form_id: str = None, form_types: Dict = None) ->
                     slide_fields[key] = value
         
         # 폼_데이터에서도 리포트/슬라이드 필드 제거 (프롬프트에서 별도 반환하도록 지시했으므로)
-        if isinstance(pure_form_data, dict):
-            for key in list(pure_form_data.keys()):
-                if key in report_field_keys or key in slide_field_keys:
-                    # 폼_데이터에 포함되어 있다면 별도 필드로 이동
-                    if key in report_field_keys and key not in report_fields:
-                        report_fields[key] = pure_form_data.pop(key, None)
-                    elif key in slide_field_keys and key not in slide_fields:
-                        slide_fields[key] = pure_form_data.pop(key, None)
-                    else:
-                        pure_form_data.pop(key, None)
+        typed_keys = report_field_keys | slide_field_keys
+        moved = [key for key in pure_form_data if key in typed_keys] if isinstance(pure_form_data, dict) and typed_keys else []
+        if moved:
+            # 폼_데이터에 포함되어 있다면 별도 필드로 이동
+            for key in moved:
+                if key in report_field_keys:
+                    report_fields.setdefault(key, pure_form_data[key])
+                else:
+                    slide_fields.setdefault(key, pure_form_data[key])
+            # 키별 pop 대신 한 번에 새 dict 구성 (파싱 생략 경로의 crewai 결과 dict 도 변경하지 않음)
+            pure_form_data = {k: v for k, v in pure_form_data.items() if k not in typed_keys}
         
-        pure_form_preview = str(pure_form_data)[:200] + ("..." if len(str(pure_form_data)) > 200 else "")
-        logger.info(f"🔍 pure_form_data (처음 200자): {pure_form_preview}")
-        logger.info(f"🔍 리포트 필드: {list(report_fields.keys())}")
-        logger.info(f"🔍 슬라이드 필드: {list(slide_fields.keys())}")
-
         # 5) form_id 래핑 (요청사항: form_id로 {} 해서 dict 반환)
         wrapped_form_data = {form_id: pure_form_data} if form_id else pure_form_data
-        wrapped_preview = str(wrapped_form_data)[:200] + ("..." if len(str(wrapped_form_data)) > 200 else "")
-        logger.info(f"🔍 wrapped_form_data (처음 200자): {wrapped_preview}")
-        
-        # 6) 원본에서 '폼_데이터' 제거
-        if isinstance(original_wo_form, dict):
-            original_wo_form.pop("폼_데이터", None)
+
+        # 미리보기 문자열은 INFO 로그가 켜져 있을 때만 만든다 (큰 폼 dict 전체 repr 비용 회피)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🔍 pure_form_data (처음 200자): %s", log_preview(pure_form_data))
+            logger.info("🔍 리포트 필드: %s", list(report_fields))
+            logger.info("🔍 슬라이드 필드: %s", list(slide_fields))
+            logger.info("🔍 wrapped_form_data (처음 200자): %s", log_preview(wrapped_form_data))
 
         return pure_form_data, wrapped_form_data, original_wo_form, report_fields, slide_fields
 
     except Exception as e:
-        logger.error(f"❌ Crew 결과 변환 실패: {e}", exc_info=True)
+        logger.error("❌ Crew 결과 변환 실패: %s", e, exc_info=True)
         raise